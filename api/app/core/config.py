@@ -10,11 +10,44 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str
     POSTGRES_HOST: str = "localhost"
     POSTGRES_PORT: str = "5432"
+    # Пул на один воркер: всего соединений до API_WORKERS * (DB_POOL_SIZE + DB_MAX_OVERFLOW + 4)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 5
+    DB_POOL_TIMEOUT: float = 10.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_STATEMENT_TIMEOUT_MS: int = 15000
     
     # API
     API_HOST: str = "0.0.0.0"
     API_PORT: int = 8000
     DEBUG: bool = False
+    
+    # Server
+    API_WORKERS: int = 1
+    API_RELOAD: bool = False
+    API_LOOP: str = "uvloop"
+    API_HTTP: str = "httptools"
+    API_KEEPALIVE_TIMEOUT: int = 30
+    API_BACKLOG: int = 2048
+    
+    # Background tasks
+    POSITION_CHECK_INTERVAL: int = 30
+    POSITION_CHECK_SHARDS: int = 1
+    QUEUE_LOAD_RECONCILE_INTERVAL: int = 300
+    NOTIFICATION_RETENTION_DAYS: int = 7
+    NOTIFICATION_PURGE_INTERVAL: int = 3600
+    NOTIFICATION_PURGE_BATCH_SIZE: int = 1000
+    
+    # WebSockets
+    WS_BROKER: str = "memory"  # memory | postgres
+    TICKET_WS_REFRESH_INTERVAL: int = 120
+    TICKET_WS_HEARTBEAT_SLOTS: int = 60
+    TICKET_SNAPSHOT_TTL: float = 2.0
+    WS_SEND_TIMEOUT: float = 5.0
+    WS_OUTBOX_SIZE: int = 64
+    WS_MAX_CONNECTIONS_PER_SESSION: int = 5
 
     @property
     def ASYNC_DB_URL(self) -> str:
@@ -22,6 +55,12 @@ class Settings(BaseSettings):
 
         return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
     
+    @property
+    def ASYNCPG_DSN(self) -> str:
+        """DSN для прямых подключений asyncpg (LISTEN/NOTIFY, advisory-блокировки)."""
+
+        return f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+    
     @property
     def SYNC_DB_URL(self) -> str:
         """URL для синхронного подключения к базе данных."""
@@ -0,0 +1,16 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+
+def encode_json(content: Any) -> bytes:
+    """Сериализовать в JSON через pydantic-core: модели, datetime и UUID кодируются без промежуточного dict"""
+    return to_json(content)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON-ответ, сериализуемый тем же кодировщиком, что и сообщения WebSocket"""
+
+    def render(self, content: Any) -> bytes:
+        return encode_json(content)
@@ -0,0 +1,42 @@
+from bisect import bisect_left
+
+
+class Histogram:
+    """Простая гистограмма длительностей (в секундах) с фиксированными границами корзин"""
+
+    DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def snapshot(self) -> dict:
+        """Накопительные счетчики по корзинам (как le-корзины Prometheus), сумма и максимум"""
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        buckets["+Inf"] = self.count
+
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "max": round(self.max, 6),
+            "avg": round(self.sum / self.count, 6) if self.count else 0.0,
+            "buckets": buckets,
+        }
+
+
+pool_wait_histogram = Histogram()
+pool_connect_histogram = Histogram()
+ws_delivery_histogram = Histogram()
@@ -0,0 +1,46 @@
+"""hot path indexes
+
+Revision ID: 3f7b9e0d2c15
+Revises: 9d2a4f61c8e3
+Create Date: 2026-10-16 18:20:13.604417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f7b9e0d2c15'
+down_revision: Union[str, Sequence[str], None] = '9d2a4f61c8e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_tickets_queue_id_sort_key_waiting',
+        'tickets',
+        ['queue_id', 'sort_key'],
+        postgresql_where=sa.text("is_deleted = false AND status = 'waiting'")
+    )
+    op.create_index('ix_tickets_queue_id_status', 'tickets', ['queue_id', 'status'])
+    op.create_index('ix_tickets_session_id_created_at', 'tickets', ['session_id', sa.text('created_at DESC')])
+    op.drop_index('ix_tickets_session_id', table_name='tickets')
+    op.create_index(
+        'ix_queues_event_id_active',
+        'queues',
+        ['event_id'],
+        postgresql_where=sa.text('is_deleted = false')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_queues_event_id_active', table_name='queues')
+    op.create_index('ix_tickets_session_id', 'tickets', ['session_id'])
+    op.drop_index('ix_tickets_session_id_created_at', table_name='tickets')
+    op.drop_index('ix_tickets_queue_id_status', table_name='tickets')
+    op.drop_index('ix_tickets_queue_id_sort_key_waiting', table_name='tickets')
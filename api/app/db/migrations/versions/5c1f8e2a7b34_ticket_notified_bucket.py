@@ -0,0 +1,28 @@
+"""ticket notified bucket
+
+Revision ID: 5c1f8e2a7b34
+Revises: b7e41c2d9a10
+Create Date: 2026-10-16 11:40:05.917302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1f8e2a7b34'
+down_revision: Union[str, Sequence[str], None] = 'b7e41c2d9a10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tickets', sa.Column('notified_bucket', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('tickets', 'notified_bucket')
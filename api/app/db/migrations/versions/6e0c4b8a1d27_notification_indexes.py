@@ -0,0 +1,40 @@
+"""notification indexes
+
+Revision ID: 6e0c4b8a1d27
+Revises: 3f7b9e0d2c15
+Create Date: 2026-10-16 19:05:41.218736
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6e0c4b8a1d27'
+down_revision: Union[str, Sequence[str], None] = '3f7b9e0d2c15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_notifications_session_id_created_at_unsent',
+        'notifications',
+        ['session_id', 'created_at'],
+        postgresql_where=sa.text('is_sent = false')
+    )
+    op.create_index(
+        'ix_notifications_sent_at_sent',
+        'notifications',
+        ['sent_at'],
+        postgresql_where=sa.text('is_sent = true')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_notifications_sent_at_sent', table_name='notifications')
+    op.drop_index('ix_notifications_session_id_created_at_unsent', table_name='notifications')
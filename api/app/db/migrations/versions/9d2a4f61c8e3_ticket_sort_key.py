@@ -0,0 +1,50 @@
+"""ticket sort key
+
+Revision ID: 9d2a4f61c8e3
+Revises: 5c1f8e2a7b34
+Create Date: 2026-10-16 16:05:41.228190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d2a4f61c8e3'
+down_revision: Union[str, Sequence[str], None] = '5c1f8e2a7b34'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tickets', sa.Column('sort_key', sa.BigInteger(), nullable=True))
+    op.execute(
+        """
+        UPDATE tickets
+        SET sort_key = ranked.rank * 1024
+        FROM (
+            SELECT id, ROW_NUMBER() OVER (PARTITION BY queue_id ORDER BY position, created_at, id) AS rank
+            FROM tickets
+        ) AS ranked
+        WHERE tickets.id = ranked.id
+        """
+    )
+    op.alter_column('tickets', 'sort_key', nullable=False)
+    # Номер следующего талона должен давать ключ больше всех существующих
+    op.execute(
+        """
+        UPDATE queues
+        SET last_position = GREATEST(
+            queues.last_position,
+            (SELECT COUNT(*) FROM tickets WHERE tickets.queue_id = queues.id)
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('tickets', 'sort_key')
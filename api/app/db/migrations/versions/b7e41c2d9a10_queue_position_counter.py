@@ -0,0 +1,37 @@
+"""queue position counter
+
+Revision ID: b7e41c2d9a10
+Revises: e84c639b8fbd
+Create Date: 2026-10-16 09:12:41.208311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e41c2d9a10'
+down_revision: Union[str, Sequence[str], None] = 'e84c639b8fbd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('queues', sa.Column('last_position', sa.Integer(), server_default='0', nullable=False))
+    op.execute(
+        """
+        UPDATE queues
+        SET last_position = COALESCE(
+            (SELECT MAX(tickets.position) FROM tickets WHERE tickets.queue_id = queues.id),
+            0
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('queues', 'last_position')
@@ -1,9 +1,21 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Index, text
 from app.db.base import Base
 from datetime import datetime
 
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        # Повтор неотправленных уведомлений при переподключении сессии
+        Index(
+            "ix_notifications_session_id_created_at_unsent",
+            "session_id",
+            "created_at",
+            postgresql_where=text("is_sent = false")
+        ),
+        # Очистка отправленных уведомлений по сроку хранения
+        Index("ix_notifications_sent_at_sent", "sent_at", postgresql_where=text("is_sent = true")),
+        {'extend_existing': True},
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     ticket_id = Column(Integer, nullable=False)
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import String, Integer, Boolean, DateTime, ForeignKey, func
+from sqlalchemy import String, Integer, Boolean, DateTime, ForeignKey, Index, func, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -16,6 +16,7 @@ class Queue(Base):
         is_active: Активна ли очередь
         is_deleted: Удалена ли очередь (soft delete)
         current_position: Текущая позиция (кого сейчас обслуживают)
+        last_position: Последняя выданная позиция (счетчик для новых талонов)
         created_at: Время создания очереди
         updated_at: Время последнего обновления
         event: Связь с мероприятием
@@ -23,7 +24,10 @@ class Queue(Base):
     """
 
     __tablename__ = "queues"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_queues_event_id_active", "event_id", postgresql_where=text("is_deleted = false")),
+        {'extend_existing': True},
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     event_id: Mapped[int] = mapped_column(
@@ -34,6 +38,7 @@ class Queue(Base):
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     is_deleted: Mapped[bool] = mapped_column(Boolean, default=False)
     current_position: Mapped[int] = mapped_column(Integer, default=0)
+    last_position: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), onupdate=func.now())
 
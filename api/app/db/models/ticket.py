@@ -1,10 +1,15 @@
 from datetime import datetime
-from sqlalchemy import String, Integer, DateTime, ForeignKey, Text, Boolean
+from sqlalchemy import String, Integer, BigInteger, DateTime, ForeignKey, Text, Boolean, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import func
+from sqlalchemy import func, literal_column
 
 from app.db.base import Base
 
+# Статус ожидающего талона для условий запросов. Пишется в SQL литералом,
+# как в условии индекса ix_tickets_queue_id_sort_key_waiting: с параметром
+# ($1) обобщенный план подготовленного запроса не может использовать индекс
+WAITING_STATUS = literal_column("'waiting'", String)
+
 
 class Ticket(Base):
     """Модель талона участника в очереди.
@@ -13,7 +18,8 @@ class Ticket(Base):
         id: Уникальный идентификатор талона
         queue_id: ID очереди
         session_id: Идентификатор сессии пользователя
-        position: Позиция в очереди
+        position: Номер талона в очереди (не меняется, пока талон в очереди)
+        sort_key: Ключ порядка обслуживания в очереди (разреженный, с шагом SORT_KEY_GAP)
         status: Статус талона
         notes: Дополнительные заметки
         is_deleted: Флаг удаления
@@ -21,19 +27,34 @@ class Ticket(Base):
         updated_at: Время обновления
         called_at: Время вызова
         completed_at: Время завершения
+        notified_bucket: Последний порог уведомления о позиции (10, 3, 1)
         queue: Связь с очередью
     """
 
     __tablename__ = "tickets"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Ожидающие талоны очереди в порядке обслуживания (впереди, следующий, уведомления)
+        Index(
+            "ix_tickets_queue_id_sort_key_waiting",
+            "queue_id",
+            "sort_key",
+            postgresql_where=text("is_deleted = false AND status = 'waiting'")
+        ),
+        # Счетчики по статусам и каскадное удаление по queue_id
+        Index("ix_tickets_queue_id_status", "queue_id", "status"),
+        # Талоны сессии, новые первыми
+        Index("ix_tickets_session_id_created_at", "session_id", text("created_at DESC")),
+        {'extend_existing': True},
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     queue_id: Mapped[int] = mapped_column(
         ForeignKey("queues.id", ondelete="CASCADE"),
         nullable=False
     )
-    session_id: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
+    session_id: Mapped[str] = mapped_column(String(100), nullable=False)
     position: Mapped[int] = mapped_column(Integer, nullable=False)
+    sort_key: Mapped[int] = mapped_column(BigInteger, nullable=False)
     status: Mapped[str] = mapped_column(
         String(20), 
         default="waiting",
@@ -45,6 +66,7 @@ class Ticket(Base):
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), onupdate=func.now())
     called_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     completed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    notified_bucket: Mapped[int | None] = mapped_column(Integer, nullable=True)
 
     # Связи
     queue: Mapped["Queue"] = relationship("Queue", back_populates="tickets")
\ No newline at end of file
@@ -1,12 +1,59 @@
+from time import perf_counter
+
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import settings
+from app.core.metrics import pool_connect_histogram, pool_wait_histogram
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Пул соединений, измеряющий время ожидания выдачи соединения.
+
+    Установка нового соединения (переполнение пула) измеряется отдельно
+    и не входит во время ожидания свободного соединения.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # id записи нового соединения -> время его установки
+        self._connect_seconds: dict[int, float] = {}
+
+    def _create_connection(self):
+        started = perf_counter()
+        record = super()._create_connection()
+        elapsed = perf_counter() - started
+        pool_connect_histogram.observe(elapsed)
+        self._connect_seconds[id(record)] = elapsed
+        return record
+
+    def _do_get(self):
+        started = perf_counter()
+        connect_seconds = 0.0
+        try:
+            record = super()._do_get()
+            connect_seconds = self._connect_seconds.pop(id(record), 0.0)
+            return record
+        finally:
+            pool_wait_histogram.observe(perf_counter() - started - connect_seconds)
 
 
 engine = create_async_engine (
     settings.ASYNC_DB_URL,
     echo=settings.DEBUG,
+    poolclass=TimedQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args={
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "server_settings": {
+            "statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS),
+        },
+    },
 )
 
 AsyncSessionLocal = sessionmaker(
@@ -20,4 +67,4 @@ async def get_db():
         try:
             yield session
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
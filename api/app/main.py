@@ -4,6 +4,7 @@ import asyncio
 
 from app.core.config import settings
 from app.core.security import CORS_SETTINGS
+from app.core.encoding import FastJSONResponse
 from app.routers import (
     private_health_router,
     private_event_router, 
@@ -16,15 +17,33 @@ from app.routers import (
     queue_analytics_router,
     ticket_analytics_router,
     ticket_ws_router,
+    queue_ws_router,
+    event_ws_router,
     websocket_management_router
 )
-from app.services.background_tasks import check_queue_positions
+from app.db.session import AsyncSessionLocal
+from app.services.background_tasks import (
+    check_queue_positions,
+    purge_notifications,
+    reconcile_queue_indexes,
+    apply_remote_queue_changes,
+    resync_queue_indexes,
+)
+from app.services.queue_load import queue_load_index
+from app.services.queue_positions import queue_position_index
+from app.services.queue_events import queue_events, QUEUE_EVENTS_CHANNEL
+from app.services.websockets.brokers import broker
+from app.services.leader import position_check_leadership
+from app.services.websockets.notifications import notification_manager, NOTIFICATIONS_CHANNEL
+from app.services.websockets.queue_updates import push_ticket_positions, push_queue_status
+from app.services.websockets.heartbeats import ticket_heartbeats
 
 app = FastAPI(
     title="TBank Queue API",
     description="Queue management system for TBank",
     version="0.1",
     debug=settings.DEBUG,
+    default_response_class=FastJSONResponse,
 )
 
 app.add_middleware(CORSMiddleware, **CORS_SETTINGS)
@@ -40,6 +59,8 @@ app.include_router(event_analytics_router, prefix="/analytics")
 app.include_router(queue_analytics_router, prefix="/analytics")
 app.include_router(ticket_analytics_router, prefix="/analytics")
 app.include_router(ticket_ws_router, prefix="/ws")
+app.include_router(queue_ws_router, prefix="/ws")
+app.include_router(event_ws_router, prefix="/ws")
 app.include_router(websocket_management_router, prefix="/ws/management")
 
 from app.routers.websockets.notifications import router as notification_ws_router
@@ -47,4 +68,26 @@ app.include_router(notification_ws_router, prefix="/api/notifications")
 
 @app.on_event("startup")
 async def startup_event():
+    async with AsyncSessionLocal() as db:
+        await queue_load_index.rebuild(db)
+        await queue_position_index.rebuild(db)
+    
+    queue_events.subscribe_remote(apply_remote_queue_changes)
+    queue_events.subscribe_resync(resync_queue_indexes)
+    queue_events.subscribe(push_ticket_positions)
+    queue_events.subscribe(push_queue_status)
+    broker.subscribe(QUEUE_EVENTS_CHANNEL, queue_events.handle_broker_message)
+    broker.subscribe(NOTIFICATIONS_CHANNEL, notification_manager.handle_broker_message)
+    await broker.start()
+    
+    asyncio.create_task(queue_events.run())
     asyncio.create_task(check_queue_positions())
+    asyncio.create_task(reconcile_queue_indexes())
+    asyncio.create_task(purge_notifications())
+    asyncio.create_task(ticket_heartbeats.run())
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await position_check_leadership.release()
+    await broker.stop()
@@ -12,6 +12,8 @@ from .analytics.queue_analytics import router as queue_analytics_router
 from .analytics.ticket_analytics import router as ticket_analytics_router
 
 from .websockets.ticket import router as ticket_ws_router
+from .websockets.queue import router as queue_ws_router
+from .websockets.event import router as event_ws_router
 from .websockets.management import router as websocket_management_router  
 
 __all__ = [
@@ -26,5 +28,7 @@ __all__ = [
     "queue_analytics_router",
     "ticket_analytics_router",
     "ticket_ws_router",
+    "queue_ws_router",
+    "event_ws_router",
     "websocket_management_router"
 ]
\ No newline at end of file
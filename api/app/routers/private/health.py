@@ -2,7 +2,8 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
-from app.db.session import get_db
+from app.db.session import get_db, engine
+from app.core.metrics import pool_connect_histogram, pool_wait_histogram
 from app.db.models import Account
 from app.core.dependencies import get_current_admin
 
@@ -47,4 +48,21 @@ async def db_health_check(db: AsyncSession = Depends(get_db),
         await db.execute(text("SELECT 1"))
         return {"status": "healthy", "database": "connected"}
     except Exception as e:
-        return {"status": "unhealthy", "database": "error", "message": str(e)}
\ No newline at end of file
+        return {"status": "unhealthy", "database": "error", "message": str(e)}
+
+
+@router.get(
+    "/pool",
+    summary="Статистика пула соединений с БД",
+    description="Состояние пула соединений, гистограммы времени ожидания свободного соединения и установки нового соединения (в секундах)."
+)
+async def db_pool_stats(current_admin: Account = Depends(get_current_admin)) -> dict:
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "wait_seconds": pool_wait_histogram.snapshot(),
+        "connect_seconds": pool_connect_histogram.snapshot()
+    }
\ No newline at end of file
@@ -6,6 +6,8 @@ from app.db.models import Account
 from app.core.dependencies import get_current_admin
 from app.schemas.queue import *
 from app.services.crud.queue import *
+from app.services.crud.ticket import call_next_ticket
+from app.schemas.ticket import TicketResponse
 
 
 router = APIRouter(tags=["private-queues"])
@@ -94,13 +96,13 @@ async def update_queue_route(queue_id: int, queue_data: QueueUpdate, db: AsyncSe
 async def delete_queue_route(queue_id: int, delete_request: QueueDeleteRequest, db: AsyncSession = Depends(get_db),
                              current_admin: Account = Depends(get_current_admin)) -> dict:
     try:
-        success = await delete_queue(
+        moved = await delete_queue(
             db, 
             queue_id, 
             delete_request.hard_delete,
             delete_request.move_tickets_to
         )
-        if not success:
+        if moved is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Очередь не найдена"
@@ -115,6 +117,8 @@ async def delete_queue_route(queue_id: int, delete_request: QueueDeleteRequest,
         
         if delete_request.move_tickets_to:
             response["tickets_moved_to"] = delete_request.move_tickets_to
+            response["tickets_moved"] = sum(moved.values())
+            response["tickets_moved_by_status"] = moved
             
         return response
         
@@ -140,6 +144,27 @@ async def call_next_route(queue_id: int, db: AsyncSession = Depends(get_db),
     return queue
 
 
+@router.post(
+    "/{queue_id}/call-next", 
+    response_model=TicketResponse
+)
+async def call_next_ticket_route(queue_id: int, db: AsyncSession = Depends(get_db),
+                                 current_admin: Account = Depends(get_current_admin)) -> TicketResponse:
+    try:
+        ticket = await call_next_ticket(db, queue_id)
+        if not ticket:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Очередь не найдена"
+            )
+        return ticket
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
 @router.post(
     "/{queue_id}/reset", 
     response_model=QueueResponse
@@ -52,49 +52,73 @@ async def get_ticket_position_route(ticket_id: int, db: AsyncSession = Depends(g
 @router.put("/{ticket_id}", response_model=TicketResponse)
 async def update_ticket_route(ticket_id: int, ticket_data: TicketUpdate, db: AsyncSession = Depends(get_db),
                               current_admin: Account = Depends(get_current_admin)) -> TicketResponse:
-    ticket = await update_ticket(db, ticket_id, ticket_data)
-    if not ticket:
+    try:
+        ticket = await update_ticket(db, ticket_id, ticket_data)
+        if not ticket:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Талон не найден"
+            )
+        return ticket
+    except ValueError as e:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Талон не найден"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
         )
-    return ticket
 
 
 @router.post("/{ticket_id}/call", response_model=TicketResponse)
 async def call_ticket_route(ticket_id: int, call_data: TicketCallRequest, db: AsyncSession = Depends(get_db),
                             current_admin: Account = Depends(get_current_admin)) -> TicketResponse:
-    ticket = await call_ticket(db, ticket_id, call_data.notes)
-    if not ticket:
+    try:
+        ticket = await call_ticket(db, ticket_id, call_data.notes)
+        if not ticket:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Талон не найден"
+            )
+        return ticket
+    except ValueError as e:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Талон не найден"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
         )
-    return ticket
 
 
 @router.post("/{ticket_id}/complete", response_model=TicketResponse)
 async def complete_ticket_route(ticket_id: int, complete_data: TicketCompleteRequest, db: AsyncSession = Depends(get_db),
                                 current_admin: Account = Depends(get_current_admin)) -> TicketResponse:
-    ticket = await complete_ticket(db, ticket_id, complete_data.notes)
-    if not ticket:
+    try:
+        ticket = await complete_ticket(db, ticket_id, complete_data.notes)
+        if not ticket:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Талон не найден"
+            )
+        return ticket
+    except ValueError as e:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Талон не найден"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
         )
-    return ticket
 
 
 @router.post("/{ticket_id}/cancel", response_model=TicketResponse)
 async def cancel_ticket_route(ticket_id: int, db: AsyncSession = Depends(get_db),
                               current_admin: Account = Depends(get_current_admin)) -> TicketResponse:
-    ticket = await cancel_ticket(db, ticket_id)
-    if not ticket:
+    try:
+        ticket = await cancel_ticket(db, ticket_id)
+        if not ticket:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Талон не найден"
+            )
+        return ticket
+    except ValueError as e:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Талон не найден"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
         )
-    return ticket
 
 
 @router.post("/{ticket_id}/move", response_model=TicketResponse)
@@ -62,17 +62,18 @@ async def update_ticket_public_route(
             detail="Доступ запрещен"
         )
     
-    ticket = await update_ticket_public(db, ticket_id, ticket_update, x_session_id)
-    if not ticket:
+    try:
+        ticket = await update_ticket_public(db, ticket_id, ticket_update, x_session_id)
+    except ValueError as e:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Талон не найден"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
         )
     
-    if ticket.status in ["called", "completed", "cancelled"]:
+    if not ticket:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Невозможно обновить обработанный талон"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Талон не найден"
         )
     
     return ticket
@@ -84,7 +85,14 @@ async def cancel_ticket_route(
     x_session_id: str = Header(..., alias="X-Session-ID"),
     db: AsyncSession = Depends(get_db),
 ) -> TicketResponse:
-    ticket = await cancel_ticket(db, ticket_id, x_session_id)
+    try:
+        ticket = await cancel_ticket(db, ticket_id, x_session_id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
     if not ticket:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -97,7 +105,10 @@ async def cancel_ticket_route(
 @router.post("/{ticket_id}/call", response_model=TicketResponse)
 async def call_ticket_route(ticket_id: int, call_data: TicketCallRequest, db: AsyncSession = Depends(get_db),
                             current_admin: Account = Depends(get_current_admin)) -> TicketResponse:
-    ticket = await call_ticket(db, ticket_id, call_data.notes)
+    try:
+        ticket = await call_ticket(db, ticket_id, call_data.notes)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if not ticket:
         raise HTTPException(status_code=404, detail="Талон не найден")
     
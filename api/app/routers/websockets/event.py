@@ -0,0 +1,49 @@
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status
+from app.db.session import AsyncSessionLocal
+from app.services.analytics.queue_ws import get_event_board_data
+from app.services.crud.event import get_event
+from app.services.websockets.managers import manager_factory
+from app.services.websockets.queue_updates import remember_queue_events
+from app.services.websockets.delivery import enqueue, send
+
+router = APIRouter()
+
+@router.websocket("/event/{event_id}")
+async def websocket_event_status(websocket: WebSocket, event_id: int):
+    """Состояние всех очередей мероприятия: event_status при подключении, затем queue_status измененных очередей.
+
+    Команды клиента: ping (ответ pong), resync или refresh (текущее состояние всех очередей).
+    """
+    event_manager = manager_factory.get_manager("events")
+    
+    await event_manager.subscribe_to_entity(websocket, event_id)
+
+    async def send_status() -> bool:
+        async with AsyncSessionLocal() as db:
+            if not await get_event(db, event_id):
+                await send(websocket, {"type": "error", "message": "Мероприятие не найдено"})
+                return False
+            message = await get_event_board_data(db, event_id)
+        remember_queue_events(message.queues)
+        enqueue(websocket, message)
+        return True
+    
+    try:
+        if not await send_status():
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+        
+        while True:
+            data = await websocket.receive_text()
+            
+            if data == "ping":
+                enqueue(websocket, "pong")
+            elif data in ("resync", "refresh"):
+                await send_status()
+                
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        print(f"WebSocket error for event {event_id}: {e}")
+    finally:
+        event_manager.unsubscribe_from_entity(websocket, event_id)
@@ -1,6 +1,9 @@
 from fastapi import APIRouter, Depends
 from app.services.websockets.managers import manager_factory
 from app.core.dependencies import get_current_admin
+from app.core.metrics import ws_delivery_histogram
+from app.services.websockets.notifications import notification_manager
+from app.services.websockets.heartbeats import ticket_heartbeats
 
 router = APIRouter()
 
@@ -8,10 +11,18 @@ router = APIRouter()
 async def get_websocket_stats(current_admin = Depends(get_current_admin)):
     """Получить статистику WebSocket соединений"""
     ticket_manager = manager_factory.get_manager("tickets")
+    queue_manager = manager_factory.get_manager("queues")
+    event_manager = manager_factory.get_manager("events")
     
     return {
         "active_ticket_subscriptions": await ticket_manager.get_subscribed_tickets(),
         "total_ticket_subscriptions": len(ticket_manager.ticket_subscriptions),
-        "queues_manager_connections": len(ticket_manager.active_connections.get("queues", set())),
-        "events_manager_connections": len(ticket_manager.active_connections.get("events", set()))
+        "queues_manager_connections": queue_manager.get_connections_count(),
+        "events_manager_connections": event_manager.get_connections_count(),
+        "active_queue_subscriptions": await queue_manager.get_subscribed_queues(),
+        "active_event_subscriptions": await event_manager.get_subscribed_events(),
+        "heartbeat_connections": len(ticket_heartbeats),
+        "notification_sessions": len(notification_manager.active_connections),
+        "notification_connections": sum(len(c) for c in notification_manager.active_connections.values()),
+        "delivery_seconds": ws_delivery_histogram.snapshot()
     }
\ No newline at end of file
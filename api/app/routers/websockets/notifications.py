@@ -5,11 +5,11 @@ from app.services.websockets.notifications import websocket_endpoint, notificati
 router = APIRouter(tags=["notifications"])
 
 @router.websocket("/ws/{session_id}")
-async def websocket_notifications(websocket: WebSocket, session_id: str):
-    await websocket_endpoint(websocket, session_id)
+async def websocket_notifications(websocket: WebSocket, session_id: str, after: int | None = None):
+    await websocket_endpoint(websocket, session_id, after)
 
 @router.get("/{session_id}")
-async def get_notifications(session_id: str, db: AsyncSession = Depends(get_db)):
+async def get_notifications(session_id: str, after: int | None = None, db: AsyncSession = Depends(get_db)):
     from app.services.crud.notification import get_unsent_notifications
-    notifications = await get_unsent_notifications(db, session_id)
+    notifications = await get_unsent_notifications(db, session_id, after)
     return notifications
\ No newline at end of file
@@ -0,0 +1,48 @@
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status
+from app.db.session import AsyncSessionLocal
+from app.services.analytics.queue_ws import get_queue_board_data
+from app.services.websockets.managers import manager_factory
+from app.services.websockets.queue_updates import remember_queue_events
+from app.services.websockets.delivery import enqueue, send
+
+router = APIRouter()
+
+@router.websocket("/queue/{queue_id}")
+async def websocket_queue_status(websocket: WebSocket, queue_id: int):
+    """Состояние очереди для табло и пультов операторов: снимок при подключении, затем при каждом изменении.
+
+    Команды клиента: ping (ответ pong), resync или refresh (текущее состояние).
+    """
+    queue_manager = manager_factory.get_manager("queues")
+    
+    await queue_manager.subscribe_to_entity(websocket, queue_id)
+
+    async def send_status() -> bool:
+        async with AsyncSessionLocal() as db:
+            messages = await get_queue_board_data(db, [queue_id])
+        if not messages:
+            await send(websocket, {"type": "error", "message": "Очередь не найдена"})
+            return False
+        remember_queue_events(messages)
+        enqueue(websocket, messages[0], key=("queue", queue_id))
+        return True
+    
+    try:
+        if not await send_status():
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+        
+        while True:
+            data = await websocket.receive_text()
+            
+            if data == "ping":
+                enqueue(websocket, "pong")
+            elif data in ("resync", "refresh"):
+                await send_status()
+                
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        print(f"WebSocket error for queue {queue_id}: {e}")
+    finally:
+        queue_manager.unsubscribe_from_entity(websocket, queue_id)
@@ -1,46 +1,45 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from app.services.websockets.managers import manager_factory
-from app.services.analytics.ticket_ws import get_ticket_websocket_data
-from app.db import get_db
-import asyncio
+from app.services.ticket_snapshots import ticket_snapshot_cache
+from app.services.websockets.delivery import enqueue
+from app.services.websockets.heartbeats import ticket_heartbeats
 
 router = APIRouter()
 
 @router.websocket("/ticket/{ticket_id}")
 async def websocket_ticket_info(websocket: WebSocket, ticket_id: int):
+    """Обновления талона: полный снимок с версией, затем дельты и heartbeat.
+
+    Команды клиента: ping (ответ pong), resync или refresh (полный снимок).
+    Страховочная сверка и heartbeat идут из общего колеса ticket_heartbeats,
+    у соединения нет собственного таймера.
+    """
     ticket_manager = manager_factory.get_manager("tickets")
     
     await ticket_manager.subscribe_to_entity(websocket, ticket_id)
+
+    async def send_snapshot():
+        ticket_manager.publish_ticket_state(ticket_id, *await ticket_snapshot_cache.get(ticket_id))
+        enqueue(websocket, ticket_manager.get_ticket_snapshot(ticket_id), key=("ticket", ticket_id))
     
     try:
-        # Отправляем начальные данные
-        async for db in get_db():
-            ticket_data = await get_ticket_websocket_data(db, ticket_id)
-            await ticket_manager.notify_entity_subscribers(ticket_id, ticket_data.model_dump())
+        # Отправляем начальный снимок только новому соединению
+        await send_snapshot()
+        ticket_heartbeats.add((websocket, ticket_id))
         
         # Основной цикл соединения
         while True:
-            try:
-                # Ожидаем сообщения от клиента с таймаутом
-                data = await asyncio.wait_for(websocket.receive_text(), timeout=30.0)
-                
-                if data == "ping":
-                    await websocket.send_text("pong")
-                elif data == "refresh":
-                    async for db in get_db():
-                        ticket_data = await get_ticket_websocket_data(db, ticket_id)
-                        await websocket.send_json(ticket_data.model_dump())
-                        
-            except asyncio.TimeoutError:
-                # Таймаут - отправляем обновление и heartbeat
-                async for db in get_db():
-                    ticket_data = await get_ticket_websocket_data(db, ticket_id)
-                    await ticket_manager.notify_entity_subscribers(ticket_id, ticket_data.model_dump())
-                await websocket.send_text("ping")
+            data = await websocket.receive_text()
+            
+            if data == "ping":
+                enqueue(websocket, "pong")
+            elif data in ("resync", "refresh"):
+                await send_snapshot()
                 
     except WebSocketDisconnect:
         pass
     except Exception as e:
         print(f"WebSocket error for ticket {ticket_id}: {e}")
     finally:
-        ticket_manager.unsubscribe_from_entity(websocket, ticket_id)
\ No newline at end of file
+        ticket_heartbeats.discard((websocket, ticket_id))
+        ticket_manager.unsubscribe_from_entity(websocket, ticket_id)
@@ -21,6 +21,49 @@ class TicketWebSocketMessage(BaseModel):
     status: str
 
 
+class TicketSnapshotMessage(TicketWebSocketMessage):
+    """Полный снимок талона с версией: при подписке, по запросу resync и вместо вытесненной дельты"""
+    version: int
+
+
+class TicketDeltaMessage(BaseModel):
+    """Изменившиеся поля снимка талона; версия растет на единицу с каждой дельтой"""
+    type: str = "ticket_delta"
+    ticket_id: int
+    version: int
+    changes: dict[str, Any]
+
+
+class QueueBoardMessage(BaseModel):
+    """Состояние очереди для табло и пультов операторов"""
+    type: str = "queue_status"
+    queue_id: int
+    event_id: int
+    name: str
+    is_active: bool
+    is_deleted: bool
+    current_position: int
+    now_serving: list[str]
+    next_numbers: list[str]
+    waiting_count: int
+    processing_count: int
+    completed_count: int
+
+
+class EventBoardMessage(BaseModel):
+    """Состояние всех очередей мероприятия; дальше по каналу идут QueueBoardMessage измененных очередей"""
+    type: str = "event_status"
+    event_id: int
+    queues: list[QueueBoardMessage]
+
+
+class TicketHeartbeatMessage(BaseModel):
+    """Снимок не изменился с версии `version`"""
+    type: str = "heartbeat"
+    ticket_id: int
+    version: int
+
+
 class EventStatsUpdate(BaseModel):
     event_id: int
     stats: dict[str, Any]
@@ -4,6 +4,7 @@ from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models import Queue, Ticket
+from app.services.queue_load import queue_load_index
 from app.schemas.analytics.queue_analytics import (
     QueueBasicStatsResponse,
     QueuePerformanceResponse,
@@ -31,25 +32,13 @@ async def get_queue_basic_stats(db: AsyncSession, queue_id: int) -> QueueBasicSt
             completed_count=0
         )
     
-    status_stats_stmt = select(
-        Ticket.status, 
-        func.count(Ticket.id).label('count')
-    ).where(
-        Ticket.queue_id == queue_id, 
-        Ticket.is_deleted == False
-    ).group_by(Ticket.status)
-    
-    status_stats_result = await db.execute(status_stats_stmt)
-    status_stats = status_stats_result.all()
-    
-    status_counts = {status: count for status, count in status_stats}
+    status_counts = await queue_load_index.get_counts(db, queue_id)
     
     next_ticket_stmt = select(Ticket).where(
         Ticket.queue_id == queue_id,
-        Ticket.position > queue.current_position,
         Ticket.status == 'waiting',
         Ticket.is_deleted == False
-    ).order_by(Ticket.position.asc())
+    ).order_by(Ticket.sort_key.asc())
     
     next_ticket_result = await db.execute(next_ticket_stmt)
     next_ticket = next_ticket_result.first()
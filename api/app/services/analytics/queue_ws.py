@@ -0,0 +1,93 @@
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Ticket, Queue
+from app.db.models.ticket import WAITING_STATUS
+from app.schemas.websocket import EventBoardMessage, QueueBoardMessage
+from app.services.analytics.ticket_ws import format_ticket_number
+from app.services.queue_load import queue_load_index
+
+QUEUE_BOARD_NEXT_NUMBERS = 5
+
+
+async def get_queue_board_data(db: AsyncSession, queue_ids: list[int]) -> list[QueueBoardMessage]:
+    """Состояние очередей для табло: вызванные и ближайшие ожидающие номера, счетчики.
+
+    Удаленные очереди тоже возвращаются (с is_deleted), чтобы табло могло
+    их убрать. Ближайшие ожидающие выбираются одним оконным запросом по
+    всем очередям, счетчики берутся из индекса в памяти.
+    """
+    if not queue_ids:
+        return []
+
+    result = await db.execute(select(Queue).where(Queue.id.in_(queue_ids)).order_by(Queue.name))
+    queues = result.scalars().all()
+
+    called = await db.execute(
+        select(Ticket.queue_id, Ticket.position)
+        .where(Ticket.queue_id.in_(queue_ids), Ticket.status == "called", Ticket.is_deleted == False)
+        .order_by(Ticket.called_at, Ticket.id)
+    )
+    now_serving: dict[int, list[int]] = {}
+    for queue_id, position in called.all():
+        now_serving.setdefault(queue_id, []).append(position)
+
+    ranked = (
+        select(
+            Ticket.queue_id,
+            Ticket.position,
+            func.row_number().over(partition_by=Ticket.queue_id, order_by=Ticket.sort_key).label("rank")
+        )
+        .where(Ticket.queue_id.in_(queue_ids), Ticket.status == WAITING_STATUS, Ticket.is_deleted == False)
+        .subquery()
+    )
+    waiting = await db.execute(
+        select(ranked.c.queue_id, ranked.c.position)
+        .where(ranked.c.rank <= QUEUE_BOARD_NEXT_NUMBERS)
+        .order_by(ranked.c.queue_id, ranked.c.rank)
+    )
+    next_numbers: dict[int, list[int]] = {}
+    for queue_id, position in waiting.all():
+        next_numbers.setdefault(queue_id, []).append(position)
+
+    messages = []
+    for queue in queues:
+        counts = await queue_load_index.get_counts(db, queue.id)
+        messages.append(QueueBoardMessage(
+            queue_id=queue.id,
+            event_id=queue.event_id,
+            name=queue.name,
+            is_active=queue.is_active,
+            is_deleted=queue.is_deleted,
+            current_position=queue.current_position,
+            now_serving=[format_ticket_number(queue.name, p) for p in now_serving.get(queue.id, [])],
+            next_numbers=[format_ticket_number(queue.name, p) for p in next_numbers.get(queue.id, [])],
+            waiting_count=counts.get("waiting", 0),
+            processing_count=counts.get("called", 0),
+            completed_count=counts.get("completed", 0)
+        ))
+    return messages
+
+
+def build_queue_removed_message(queue_id: int, event_id: int) -> QueueBoardMessage:
+    """Последний кадр окончательно удаленной очереди: только is_deleted, остальные поля пустые"""
+    return QueueBoardMessage(
+        queue_id=queue_id,
+        event_id=event_id,
+        name="",
+        is_active=False,
+        is_deleted=True,
+        current_position=0,
+        now_serving=[],
+        next_numbers=[],
+        waiting_count=0,
+        processing_count=0,
+        completed_count=0
+    )
+
+
+async def get_event_board_data(db: AsyncSession, event_id: int) -> EventBoardMessage:
+    """Состояние всех неудаленных очередей мероприятия"""
+    result = await db.execute(select(Queue.id).where(Queue.event_id == event_id, Queue.is_deleted == False))
+    queues = await get_queue_board_data(db, list(result.scalars().all()))
+    return EventBoardMessage(event_id=event_id, queues=queues)
@@ -1,13 +1,14 @@
 from datetime import datetime
-from sqlalchemy import select, func
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models import Ticket, Queue
 from app.schemas.websocket import TicketWebSocketMessage
+from app.services.queue_positions import queue_position_index
 
 
-async def get_ticket_websocket_data(db: AsyncSession, ticket_id: int) -> TicketWebSocketMessage:
-    """Получить данные для WebSocket о талоне"""
+async def get_ticket_websocket_snapshot(db: AsyncSession, ticket_id: int) -> tuple[int | None, TicketWebSocketMessage]:
+    """Получить данные для WebSocket о талоне вместе с ID его очереди"""
     
     # Получаем талон с информацией об очереди
     stmt = select(Ticket, Queue).join(Queue).where(Ticket.id == ticket_id)
@@ -16,28 +17,32 @@ async def get_ticket_websocket_data(db: AsyncSession, ticket_id: int) -> TicketW
     
     if not ticket_data:
         # Если талон не найден, возвращаем пустые данные
-        return TicketWebSocketMessage(
-            type="ticket_info",
-            ticket_id=ticket_id,
-            position=0,
-            people_ahead=0,
-            queue_name="Не найдено",
-            queue_letter="X",
-            estimated_wait_time=None,
-            status="not_found"
-        )
+        return None, build_ticket_not_found_message(ticket_id)
     
     ticket, queue = ticket_data
+    return queue.id, await build_ticket_websocket_message(db, ticket, queue)
+
+
+async def get_tickets_websocket_data(
+    db: AsyncSession,
+    ticket_ids: list[int]
+) -> dict[int, tuple[int, TicketWebSocketMessage]]:
+    """Получить данные для WebSocket о талонах любых очередей одним запросом: ticket_id -> (ID очереди, данные)"""
     
-    # Считаем сколько людей перед талоном (ожидающих и обслуживаемых)
-    people_ahead_stmt = select(func.count(Ticket.id)).where(
-        Ticket.queue_id == queue.id,
-        Ticket.position < ticket.position,
-        Ticket.status.in_(['waiting', 'processing']),
-        Ticket.is_deleted == False
-    )
-    people_ahead_result = await db.execute(people_ahead_stmt)
-    people_ahead = people_ahead_result.scalar() or 0
+    stmt = select(Ticket, Queue).join(Queue).where(Ticket.id.in_(ticket_ids))
+    result = await db.execute(stmt)
+    
+    return {
+        ticket.id: (queue.id, await build_ticket_websocket_message(db, ticket, queue))
+        for ticket, queue in result.all()
+    }
+
+
+async def build_ticket_websocket_message(db: AsyncSession, ticket: Ticket, queue: Queue) -> TicketWebSocketMessage:
+    """Собрать сообщение WebSocket о талоне"""
+    
+    # Считаем сколько людей перед талоном (ожидающих)
+    people_ahead = await queue_position_index.count_ahead(db, queue.id, ticket.sort_key)
     
     # Рассчитываем примерное время ожидания (2 минуты на человека)
     estimated_wait_time = people_ahead * 2
@@ -50,7 +55,7 @@ async def get_ticket_websocket_data(db: AsyncSession, ticket_id: int) -> TicketW
     
     return TicketWebSocketMessage(
         type="ticket_info",
-        ticket_id=ticket_id,
+        ticket_id=ticket.id,
         position=ticket.position,
         people_ahead=people_ahead,
         queue_name=queue_name,
@@ -60,6 +65,26 @@ async def get_ticket_websocket_data(db: AsyncSession, ticket_id: int) -> TicketW
     )
 
 
+def build_ticket_not_found_message(ticket_id: int) -> TicketWebSocketMessage:
+    """Сообщение WebSocket о несуществующем талоне"""
+    return TicketWebSocketMessage(
+        type="ticket_info",
+        ticket_id=ticket_id,
+        position=0,
+        people_ahead=0,
+        queue_name="Не найдено",
+        queue_letter="X",
+        estimated_wait_time=None,
+        status="not_found"
+    )
+
+
+def format_ticket_number(queue_name: str | None, position: int) -> str:
+    """Номер талона для отображения: буква очереди + позиция (A-007)"""
+    queue_letter = queue_name[0] if queue_name else "A"
+    return f"{queue_letter}-{position:03d}"
+
+
 async def get_ticket_display_data(db: AsyncSession, ticket_id: int) -> dict[str, str]:
     """Получить данные для отображения талона (буква + номер)"""
     stmt = select(Ticket, Queue).join(Queue).where(Ticket.id == ticket_id)
@@ -70,10 +95,8 @@ async def get_ticket_display_data(db: AsyncSession, ticket_id: int) -> dict[str,
         return {"ticket_number": "X-000", "queue_name": "Не найдено"}
     
     ticket, queue = ticket_data
-    queue_letter = queue.name[0] if queue.name else "A"
-    ticket_number = f"{queue_letter}-{ticket.position:03d}"
     
     return {
-        "ticket_number": ticket_number,
+        "ticket_number": format_ticket_number(queue.name, ticket.position),
         "queue_name": queue.name or "Очередь"
     }
\ No newline at end of file
@@ -1,60 +1,85 @@
 import asyncio
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from app.db.session import get_db
-from app.db.models.queue import Queue
-from app.db.models.ticket import Ticket
+from app.db.session import AsyncSessionLocal
+from app.core.config import settings
 from app.services.notification_service import NotificationService
-
-async def get_all_active_queues(db: AsyncSession):
-    result = await db.execute(
-        select(Queue).where(
-            Queue.is_active == True,
-            Queue.is_deleted == False
-        )
-    )
-    return result.scalars().all()
-
-async def get_waiting_tickets_for_queue(db: AsyncSession, queue_id: int):
-    result = await db.execute(
-        select(Ticket).where(
-            Ticket.queue_id == queue_id,
-            Ticket.status == "waiting",
-            Ticket.is_deleted == False
-        ).order_by(Ticket.position)
-    )
-    return result.scalars().all()
+from app.services.crud.notification import purge_sent_notifications
+from app.services.queue_load import queue_load_index
+from app.services.queue_positions import queue_position_index
+from app.services.queue_events import QueueChange
+from app.services.leader import position_check_leadership
 
 async def check_queue_positions():
+    """Обход позиций только в шардах, захваченных этим экземпляром"""
     while True:
         try:
-            db_gen = get_db()
-            db = await anext(db_gen)
+            shards = await position_check_leadership.acquire()
+            if shards:
+                async with AsyncSessionLocal() as db:
+                    await NotificationService(db).create_position_alerts(
+                        shards, position_check_leadership.shards
+                    )
             
-            try:
-                notification_service = NotificationService(db)
-                active_queues = await get_all_active_queues(db)
-                
-                for queue in active_queues:
-                    try:
-                        waiting_tickets = await get_waiting_tickets_for_queue(db, queue_id=queue.id)
-                        
-                        for ticket in waiting_tickets:
-                            try:
-                                await notification_service.check_ticket_position(ticket.id)
-                            except Exception:
-                                continue
-                                
-                    except Exception:
-                        continue
-                
-                await asyncio.sleep(30)
-                
-            finally:
-                try:
-                    await anext(db_gen)
-                except StopAsyncIteration:
-                    pass
-                    
-        except Exception:
-            await asyncio.sleep(60)
\ No newline at end of file
+            await asyncio.sleep(settings.POSITION_CHECK_INTERVAL)
+        except Exception as e:
+            print(f"Error checking queue positions: {e}")
+            await asyncio.sleep(60)
+
+
+async def reconcile_queue_indexes():
+    while True:
+        await asyncio.sleep(settings.QUEUE_LOAD_RECONCILE_INTERVAL)
+        try:
+            await resync_queue_indexes()
+        except Exception as e:
+            print(f"Error reconciling queue indexes: {e}")
+
+
+async def resync_queue_indexes():
+    """Сверить индексы очередей с БД и исправить расхождения"""
+    async with AsyncSessionLocal() as db:
+        drifted_load = await queue_load_index.reconcile(db)
+        drifted_positions = await queue_position_index.reconcile(db)
+    if drifted_load:
+        print(f"Queue load index drift repaired for queues: {drifted_load}")
+    if drifted_positions:
+        print(f"Queue position index drift repaired for queues: {drifted_positions}")
+
+
+async def purge_notifications():
+    """Удаление отправленных уведомлений старше срока хранения пачками, каждая в своей транзакции"""
+    while True:
+        await asyncio.sleep(settings.NOTIFICATION_PURGE_INTERVAL)
+        try:
+            purged = 0
+            while True:
+                async with AsyncSessionLocal() as db:
+                    deleted = await purge_sent_notifications(
+                        db, settings.NOTIFICATION_RETENTION_DAYS, settings.NOTIFICATION_PURGE_BATCH_SIZE
+                    )
+                purged += deleted
+                if deleted < settings.NOTIFICATION_PURGE_BATCH_SIZE:
+                    break
+                # Отдаем цикл событий запросам между пачками
+                await asyncio.sleep(0)
+            if purged:
+                print(f"Purged {purged} sent notifications")
+        except Exception as e:
+            print(f"Error purging notifications: {e}")
+
+
+async def apply_remote_queue_changes(queue_id: int, changes: list[QueueChange] | None):
+    """Применить к индексам изменения очереди, сделанные другим процессом.
+
+    Массовые изменения (changes is None) перечитываются из БД.
+    """
+    if changes is None:
+        async with AsyncSessionLocal() as db:
+            await queue_load_index.refresh_queue(db, queue_id)
+            await queue_position_index.refresh_queue(db, queue_id)
+        return
+    for sort_key, old_status, new_status in changes:
+        if old_status is not None:
+            queue_load_index.remove(queue_id, old_status)
+        if new_status is not None:
+            queue_load_index.add(queue_id, new_status)
+        queue_position_index.move(queue_id, sort_key, queue_id, sort_key, old_status, new_status)
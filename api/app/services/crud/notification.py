@@ -1,8 +1,9 @@
-from sqlalchemy import select
+from sqlalchemy import select, delete, update, any_, bindparam, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.models.notification import Notification
 from app.schemas.notification import NotificationCreate, NotificationResponse
-from datetime import datetime
+from datetime import datetime, timedelta
 
 async def create_notification(db: AsyncSession, notification_data: NotificationCreate) -> NotificationResponse:
     notification = Notification(**notification_data.model_dump())
@@ -11,22 +12,60 @@ async def create_notification(db: AsyncSession, notification_data: NotificationC
     await db.refresh(notification)
     return NotificationResponse.model_validate(notification)
 
-async def get_unsent_notifications(db: AsyncSession, session_id: str) -> list[NotificationResponse]:
+async def get_unsent_notifications(db: AsyncSession, session_id: str, after: int | None = None) -> list[NotificationResponse]:
+    """Неотправленные уведомления сессии; `after` - курсор, id последнего уведомления, уже полученного клиентом"""
+    result = await db.execute(select_unsent_notifications(session_id, after))
+    notifications = result.scalars().all()
+    return [NotificationResponse.model_validate(notification) for notification in notifications]
+
+def select_unsent_notifications(session_id: str, after: int | None = None):
     query = select(Notification).where(
         Notification.session_id == session_id,
         Notification.is_sent == False
-    ).order_by(Notification.created_at)
+    ).order_by(Notification.created_at, Notification.id)
+    if after is not None:
+        query = query.where(Notification.id > after)
+    return query
+
+async def mark_notifications_sent(db: AsyncSession, notification_ids: list[int]) -> int:
+    """Отмечает уведомления отправленными одним UPDATE ... WHERE id = ANY(:ids) и одним коммитом"""
+    if not notification_ids:
+        return 0
+    result = await db.execute(
+        update(Notification)
+        .where(
+            Notification.id == any_(bindparam("ids", notification_ids, type_=ARRAY(Integer))),
+            Notification.is_sent == False
+        )
+        .values(is_sent=True, sent_at=datetime.now())
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount
+
+async def purge_sent_notifications(db: AsyncSession, retention_days: int, batch_size: int) -> int:
+    """Удаляет одну пачку отправленных уведомлений старше `retention_days` дней.
     
-    result = await db.execute(query)
-    notifications = result.scalars().all()
-    return [NotificationResponse.model_validate(notification) for notification in notifications]
+    Пачка ограничена `batch_size` строками и берется с SKIP LOCKED, поэтому
+    удаление не держит долгих блокировок и не мешает параллельной очистке
+    в других процессах. Возвращает число удаленных строк.
+    """
+    result = await db.execute(delete_expired_notifications(retention_days, batch_size))
+    await db.commit()
+    return result.rowcount
 
-async def mark_notification_sent(db: AsyncSession, notification_id: int) -> bool:
-    result = await db.execute(select(Notification).where(Notification.id == notification_id))
-    notification = result.scalar_one_or_none()
-    if notification:
-        notification.is_sent = True
-        notification.sent_at = datetime.now()
-        await db.commit()
-        return True
-    return False
\ No newline at end of file
+def delete_expired_notifications(retention_days: int, batch_size: int):
+    expired = (
+        select(Notification.id)
+        .where(
+            Notification.is_sent == True,
+            Notification.sent_at < datetime.now() - timedelta(days=retention_days)
+        )
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    return (
+        delete(Notification)
+        .where(Notification.id.in_(expired.scalar_subquery()))
+        .execution_options(synchronize_session=False)
+    )
@@ -1,8 +1,12 @@
-from sqlalchemy import select, func
+from sqlalchemy import select, func, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models import Ticket, Queue
 from app.schemas.queue import *
+from app.services.queue_load import queue_load_index
+from app.services.queue_positions import queue_position_index
+from app.services.queue_events import queue_events
+from app.services.crud.ticket import SORT_KEY_GAP
 
 
 def generate_queue_name(existing_queues: list[Queue]) -> str:
@@ -44,6 +48,7 @@ async def create_queue(db: AsyncSession, queue_data: QueueCreate) -> QueueRespon
     db.add(queue)
     await db.commit()
     await db.refresh(queue)
+    queue_events.publish(queue.id)
     return QueueResponse.model_validate(queue)
 
 
@@ -62,15 +67,17 @@ async def get_queues_by_event(
     event_id: int,
     include_deleted: bool = False
 ) -> list[QueueResponse]:
+    result = await db.execute(select_event_queues(event_id, include_deleted))
+    queues = result.scalars().all()
+    return [QueueResponse.model_validate(queue) for queue in queues]
+
+
+def select_event_queues(event_id: int, include_deleted: bool = False):
+    """Очереди мероприятия по имени"""
     query = select(Queue).where(Queue.event_id == event_id)
     if not include_deleted:
         query = query.where(Queue.is_deleted == False)
-    
-    query = query.order_by(Queue.name)
-    
-    result = await db.execute(query)
-    queues = result.scalars().all()
-    return [QueueResponse.model_validate(queue) for queue in queues]
+    return query.order_by(Queue.name)
 
 
 async def update_queue(db: AsyncSession, queue_id: int, queue_data: QueueUpdate) -> QueueResponse | None:
@@ -99,6 +106,7 @@ async def update_queue(db: AsyncSession, queue_id: int, queue_data: QueueUpdate)
     
     await db.commit()
     await db.refresh(queue)
+    queue_events.publish(queue.id)
     return QueueResponse.model_validate(queue)
 
 
@@ -107,14 +115,22 @@ async def delete_queue(
     queue_id: int, 
     hard_delete: bool = False,
     move_tickets_to: int | None = None
-) -> bool:
-    query = select(Queue).where(Queue.id == queue_id)
+) -> dict[str, int] | None:
+    """Удаляет очередь, при необходимости перенося ее талоны в другую очередь.
+
+    Возвращает количество перенесенных талонов по их прежнему статусу
+    (пустой словарь без переноса) или None, если очередь не найдена.
+    """
+    # Блокировка строки очереди останавливает выдачу талонов в нее (выдача
+    # обновляет ту же строку) до коммита удаления
+    query = select(Queue).where(Queue.id == queue_id).with_for_update()
     result = await db.execute(query)
     queue = result.scalar_one_or_none()
     
     if not queue:
-        return False
+        return None
     
+    moved: dict[str, int] = {}
     if move_tickets_to:
         target_queue = await get_queue(db, move_tickets_to)
         if not target_queue:
@@ -123,30 +139,7 @@ async def delete_queue(
         if target_queue.id == queue_id:
             raise ValueError("Нельзя переместить талоны в ту же очередь")
         
-        tickets_to_move = await db.execute(
-            select(Ticket).where(
-                Ticket.queue_id == queue_id,
-                Ticket.is_deleted == False
-            ).order_by(Ticket.created_at.asc())
-        )
-        tickets = tickets_to_move.scalars().all()
-        
-        existing_tickets = await db.execute(
-            select(Ticket).where(
-                Ticket.queue_id == move_tickets_to,
-                Ticket.is_deleted == False
-            ).order_by(Ticket.created_at.asc())
-        )
-        existing_tickets_list = existing_tickets.scalars().all()
-        
-        all_tickets = list(existing_tickets_list) + list(tickets)
-        all_tickets_sorted = sorted(all_tickets, key=lambda x: x.created_at)
-        
-        for position, ticket in enumerate(all_tickets_sorted, 1):
-            ticket.position = position
-            if ticket.queue_id == queue_id:
-                ticket.queue_id = move_tickets_to
-                ticket.status = "waiting"
+        moved = await merge_queue_tickets(db, queue_id, move_tickets_to)
     
     if hard_delete:
         await db.delete(queue)
@@ -155,7 +148,83 @@ async def delete_queue(
         queue.is_active = False
     
     await db.commit()
-    return True
+    for old_status, count in moved.items():
+        queue_load_index.move(queue_id, move_tickets_to, old_status, "waiting", count)
+    if move_tickets_to:
+        queue_position_index.drop_queue(queue_id)
+        await queue_position_index.refresh_queue(db, move_tickets_to)
+        queue_events.publish_reload(move_tickets_to)
+    if hard_delete:
+        queue_load_index.drop_queue(queue_id)
+        queue_position_index.drop_queue(queue_id)
+    if move_tickets_to or hard_delete:
+        queue_events.publish_reload(queue_id)
+    else:
+        queue_events.publish(queue_id)
+    return moved
+
+
+async def merge_queue_tickets(db: AsyncSession, source_queue_id: int, target_queue_id: int) -> dict[str, int]:
+    """Переносит ожидающие и вызванные талоны одной очереди в конец другой на стороне БД.
+
+    Перенесенные талоны в прежнем порядке получают номера из счетчика
+    целевой очереди и ключи порядка после ее наибольшего ключа с шагом
+    SORT_KEY_GAP и снова ждут вызова. Строки целевой очереди и завершенные
+    или отмененные талоны исходной очереди не меняются. Возвращает
+    количество перенесенных талонов по их прежнему статусу.
+
+    Строка исходной очереди должна быть заблокирована вызывающим, иначе
+    талон, выданный между резервированием номеров и переносом, получит
+    номер за пределами зарезервированных.
+    """
+    movable = (
+        Ticket.queue_id == source_queue_id,
+        Ticket.is_deleted == False,
+        Ticket.status.in_(["waiting", "called"])
+    )
+    moved_count = select(func.count(Ticket.id)).where(*movable).scalar_subquery()
+    # Резервирование номеров блокирует строку целевой очереди до коммита:
+    # новые талоны не получат ключи между наибольшим ключом и перенесенными
+    allocated = (await db.execute(
+        update(Queue)
+        .where(Queue.id == target_queue_id)
+        .values(last_position=Queue.last_position + moved_count)
+        .returning(Queue.last_position, moved_count)
+    )).one()
+    first_position = allocated[0] - allocated[1] + 1
+    
+    last_key = (
+        select(func.coalesce(func.max(Ticket.sort_key), 0))
+        .where(Ticket.queue_id == target_queue_id, Ticket.is_deleted == False)
+        .scalar_subquery()
+    )
+    ranked = (
+        select(
+            Ticket.id,
+            Ticket.status.label("old_status"),
+            func.row_number().over(order_by=(Ticket.sort_key, Ticket.id)).label("queue_rank")
+        )
+        .where(*movable)
+        .subquery("ranked")
+    )
+    moved = (
+        update(Ticket)
+        .where(Ticket.id == ranked.c.id)
+        .values(
+            queue_id=target_queue_id,
+            sort_key=last_key + ranked.c.queue_rank * SORT_KEY_GAP,
+            position=first_position - 1 + ranked.c.queue_rank,
+            status="waiting",
+            notified_bucket=None
+        )
+        .returning(ranked.c.old_status)
+        .cte("moved")
+    )
+    result = await db.execute(
+        select(moved.c.old_status, func.count())
+        .group_by(moved.c.old_status)
+    )
+    return {old_status: count for old_status, count in result.all()}
 
 
 async def get_queue_status(db: AsyncSession, queue_id: int) -> QueueStatus | None:
@@ -166,41 +235,17 @@ async def get_queue_status(db: AsyncSession, queue_id: int) -> QueueStatus | Non
     if not queue:
         return None
     
-    counts_result = await db.execute(
-        select(
-            func.count(Ticket.id).filter(
-                Ticket.queue_id == queue_id,
-                Ticket.is_deleted == False,
-                Ticket.status == "waiting"
-            ).label("waiting"),
-            func.count(Ticket.id).filter(
-                Ticket.queue_id == queue_id,
-                Ticket.is_deleted == False,
-                Ticket.status == "called"
-            ).label("processing"),
-            func.count(Ticket.id).filter(
-                Ticket.queue_id == queue_id,
-                Ticket.is_deleted == False,
-                Ticket.status == "completed"
-            ).label("completed"),
-            func.count(Ticket.id).filter(
-                Ticket.queue_id == queue_id,
-                Ticket.is_deleted == False
-            ).label("total")
-        )
-    )
-    
-    counts = counts_result.first()
+    counts = await queue_load_index.get_counts(db, queue_id)
     
     return QueueStatus(
         queue_id=queue.id,
         name=queue.name,
         current_position=queue.current_position,
-        waiting_count=counts.waiting or 0,
-        processing_count=counts.processing or 0,
-        completed_count=counts.completed or 0,
+        waiting_count=counts.get("waiting", 0),
+        processing_count=counts.get("called", 0),
+        completed_count=counts.get("completed", 0),
         is_active=queue.is_active,
-        total_tickets=counts.total or 0
+        total_tickets=sum(counts.values())
     )
 
 
@@ -215,6 +260,7 @@ async def call_next(db: AsyncSession, queue_id: int) -> QueueResponse | None:
     queue.current_position += 1
     await db.commit()
     await db.refresh(queue)
+    queue_events.publish(queue.id)
     return QueueResponse.model_validate(queue)
 
 
@@ -229,4 +275,5 @@ async def reset_queue(db: AsyncSession, queue_id: int) -> QueueResponse | None:
     queue.current_position = 0
     await db.commit()
     await db.refresh(queue)
+    queue_events.publish(queue.id)
     return QueueResponse.model_validate(queue)
\ No newline at end of file
@@ -1,111 +1,146 @@
 from datetime import datetime
-from sqlalchemy import select, func
+from sqlalchemy import select, func, update, insert, literal, case, and_, or_, tuple_, String, Text, Boolean, BigInteger
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
-from app.db.models.ticket import Ticket
+from app.db.models.ticket import Ticket, WAITING_STATUS
 from app.db.models.queue import Queue
 from app.db.models.event import Event
 from app.schemas.ticket import TicketCreate, TicketUpdate, TicketUpdatePublic, TicketResponse, TicketPositionInfo
-from app.services.crud.queue import get_queues_by_event
 from app.services.websockets.notifications import notification_manager
+from app.services.queue_load import queue_load_index
+from app.services.queue_positions import queue_position_index
+from app.services.queue_events import queue_events
+
+
+# Шаг между ключами порядка соседних талонов: место для вставок без перенумерации
+SORT_KEY_GAP = 1024
+
+# Допустимые переходы: новый статус -> статусы, из которых в него можно перейти
+TICKET_STATUS_TRANSITIONS: dict[str, tuple[str, ...]] = {
+    "waiting": ("called",),
+    "called": ("waiting",),
+    "completed": ("called",),
+    "cancelled": ("waiting", "called"),
+}
+
 
 async def create_ticket(db: AsyncSession, ticket_data: TicketCreate) -> tuple[TicketResponse, bool]:
-    existing_ticket_result = await db.execute(
-        select(Ticket)
+    result = await db.execute(select_ticket_issuance(ticket_data.event_code, ticket_data.session_id))
+    issuance = result.one()
+    
+    if issuance.existing_ticket_id:
+        existing_ticket = await get_ticket(db, issuance.existing_ticket_id)
+        return existing_ticket, True
+    
+    if not issuance.event_id:
+        raise ValueError("Мероприятие не найдено, удалено или неактивно")
+    
+    if not issuance.queue_id:
+        raise ValueError("Нет активных очередей для этого мероприятия")
+    
+    ticket = await db.scalar(
+        insert_ticket_with_next_position(issuance.queue_id, ticket_data.session_id, ticket_data.notes)
+    )
+    if not ticket:
+        # Очередь удалили, пока запрос ждал ее блокировку: выбираем очередь заново
+        return await create_ticket(db, ticket_data)
+    await db.commit()
+    queue_load_index.add(ticket.queue_id, ticket.status)
+    queue_position_index.add(ticket.queue_id, ticket.sort_key)
+    queue_events.publish_change(ticket.queue_id, ticket.sort_key, None, ticket.status)
+
+    return TicketResponse.model_validate(ticket), False
+
+
+def select_ticket_issuance(event_code: str, session_id: str):
+    """Один запрос на выдачу: мероприятие, активный талон сессии и наименее загруженная очередь.
+
+    Загрузка всех очередей считается одним GROUP BY, поэтому задержка выдачи
+    не зависит от количества очередей. При равной загрузке выбирается очередь
+    с меньшей текущей позицией, затем по имени.
+    """
+    event = (
+        select(Event.id)
+        .where(
+            Event.code == event_code,
+            Event.is_deleted == False,
+            Event.is_active == True
+        )
+        .cte("event")
+    )
+    existing_ticket = (
+        select(Ticket.id)
         .join(Queue)
         .join(Event)
         .where(
-            Event.code == ticket_data.event_code,
-            Ticket.session_id == ticket_data.session_id,
+            Event.code == event_code,
+            Ticket.session_id == session_id,
             Ticket.is_deleted == False,
             Ticket.status.in_(["waiting", "called"])
         )
+        .order_by(Ticket.created_at.desc())
+        .limit(1)
+        .cte("existing_ticket")
     )
-    
-    existing_ticket = existing_ticket_result.scalar_one_or_none()
-    if existing_ticket:
-        return TicketResponse.model_validate(existing_ticket), True
-    
-    event_result = await db.execute(  
-        select(Event).where(
-            Event.code == ticket_data.event_code,
-            Event.is_deleted == False,
-            Event.is_active == True
+    least_loaded_queue = (
+        select(Queue.id)
+        .join(event, Queue.event_id == event.c.id)
+        .outerjoin(
+            Ticket,
+            and_(
+                Ticket.queue_id == Queue.id,
+                Ticket.is_deleted == False,
+                Ticket.status == WAITING_STATUS
+            )
         )
-    )
-    event = event_result.scalar_one_or_none()
-    if not event:
-        raise ValueError("Мероприятие не найдено, удалено или неактивно")
-    
-    queues = await get_queues_by_event(db, event.id)  
-    if not queues:
-        raise ValueError("Нет активных очередей для этого мероприятия")
-    
-    least_loaded_queue = await find_least_loaded_queue(db, queues)
-    if not least_loaded_queue:
-        raise ValueError("Не найдена подходящая очередь")
-    
-    result = await db.execute(
-        select(Ticket.position)
         .where(
-            Ticket.queue_id == least_loaded_queue.id,
-            Ticket.is_deleted == False
+            Queue.is_active == True,
+            Queue.is_deleted == False
         )
-        .order_by(Ticket.position.desc())
+        .group_by(Queue.id)
+        .order_by(func.count(Ticket.id), Queue.current_position, Queue.name)
+        .limit(1)
+        .cte("least_loaded_queue")
     )
-    last_position = result.scalar()
-    next_position = (last_position or 0) + 1
-    
-    ticket = Ticket(
-        queue_id=least_loaded_queue.id,
-        session_id=ticket_data.session_id,
-        position=next_position,
-        notes=ticket_data.notes
+    return select(
+        select(event.c.id).scalar_subquery().label("event_id"),
+        select(existing_ticket.c.id).scalar_subquery().label("existing_ticket_id"),
+        select(least_loaded_queue.c.id).scalar_subquery().label("queue_id")
     )
-    db.add(ticket)
-    await db.commit()
-    await db.refresh(ticket)
-    
-    return TicketResponse.model_validate(ticket), False
 
 
-async def find_least_loaded_queue(db: AsyncSession, queues: list[Queue]) -> Queue | None:
-    if not queues:
-        return None
-    
-    queue_loads = []
-    for queue in queues:
-        if not queue.is_active or queue.is_deleted:
-            continue
-            
-        result = await db.execute(
-            select(func.count(Ticket.id))
-            .where(
-                Ticket.queue_id == queue.id,
-                Ticket.is_deleted == False,
-                Ticket.status == "waiting"
+def insert_ticket_with_next_position(queue_id: int, session_id: str, notes: str | None):
+    """INSERT талона с позицией из счетчика очереди за один запрос.
+
+    UPDATE ... RETURNING блокирует строку очереди до конца транзакции,
+    поэтому параллельные запросы получают уникальные позиции без пропусков.
+    Ключ порядка - номер, умноженный на SORT_KEY_GAP: новый талон всегда в конце.
+    Если очередь удалили, пока запрос ждал блокировку, талон не создается.
+    """
+    allocated = (
+        update(Queue)
+        .where(Queue.id == queue_id, Queue.is_deleted == False)
+        .values(last_position=Queue.last_position + 1)
+        .returning(Queue.id, Queue.last_position)
+        .cte("allocated")
+    )
+    return (
+        insert(Ticket)
+        .from_select(
+            ["queue_id", "position", "sort_key", "session_id", "notes", "status", "is_deleted"],
+            select(
+                allocated.c.id,
+                allocated.c.last_position,
+                allocated.c.last_position * literal(SORT_KEY_GAP, BigInteger),
+                literal(session_id, String),
+                literal(notes, Text),
+                literal("waiting", String),
+                literal(False, Boolean)
             )
         )
-        waiting_count = result.scalar() or 0
-        
-        queue_loads.append({
-            "queue": queue,
-            "load": waiting_count,
-            "current_position": queue.current_position
-        })
-    
-    if not queue_loads:
-        return None
-    
-    queue_loads.sort(key=lambda x: x["load"])
-    
-    min_load = queue_loads[0]["load"]
-    min_load_queues = [q for q in queue_loads if q["load"] == min_load]
-    
-    if len(min_load_queues) > 1:
-        min_load_queues.sort(key=lambda x: x["current_position"])
-    
-    return min_load_queues[0]["queue"]
+        .returning(Ticket)
+    )
 
 
 async def get_ticket(db: AsyncSession, ticket_id: int, include_deleted: bool = False) -> TicketResponse | None:
@@ -127,7 +162,7 @@ async def get_tickets_by_queue(
     if not include_deleted:
         query = query.where(Ticket.is_deleted == False)
     
-    query = query.order_by(Ticket.position)
+    query = query.order_by(Ticket.sort_key)
     
     result = await db.execute(query)
     tickets = result.scalars().all()
@@ -139,69 +174,139 @@ async def get_tickets_by_session(
     session_id: str,
     include_deleted: bool = False
 ) -> list[TicketResponse]:
+    result = await db.execute(select_session_tickets(session_id, include_deleted))
+    tickets = result.scalars().all()
+    return [TicketResponse.model_validate(ticket) for ticket in tickets]
+
+
+def select_session_tickets(session_id: str, include_deleted: bool = False):
+    """Талоны сессии, новые первыми"""
     query = select(Ticket).where(Ticket.session_id == session_id)
     if not include_deleted:
         query = query.where(Ticket.is_deleted == False)
-    
-    query = query.order_by(Ticket.created_at.desc())
-    
-    result = await db.execute(query)
-    tickets = result.scalars().all()
-    return [TicketResponse.model_validate(ticket) for ticket in tickets]
+    return query.order_by(Ticket.created_at.desc())
 
 
 async def update_ticket(db: AsyncSession, ticket_id: int, ticket_data: TicketUpdate) -> TicketResponse | None:
-    query = select(Ticket).where(Ticket.id == ticket_id, Ticket.is_deleted == False)
-    result = await db.execute(query)
-    ticket = result.scalar_one_or_none()
-    
-    if not ticket:
-        return None
-    
     update_data = ticket_data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(ticket, field, value)
+    # Статус и сессия не бывают пустыми: null в них значит «не менять»
+    for field in ("status", "session_id"):
+        if field in update_data and update_data[field] is None:
+            del update_data[field]
+    allowed_statuses = None
+    if "status" in update_data:
+        allowed_statuses = (update_data["status"], *TICKET_STATUS_TRANSITIONS[update_data["status"]])
+    
+    transition = await transition_ticket(db, ticket_id, update_data, allowed_statuses)
+    if not transition:
+        return None
     
+    ticket, old_status = transition
     await db.commit()
-    await db.refresh(ticket)
+    queue_load_index.transition(ticket.queue_id, old_status, ticket.status)
+    queue_position_index.transition(ticket.queue_id, ticket.sort_key, old_status, ticket.status)
+    queue_events.publish_change(ticket.queue_id, ticket.sort_key, old_status, ticket.status)
     return TicketResponse.model_validate(ticket)
 
 
 async def update_ticket_public(db: AsyncSession, ticket_id: int, ticket_data: TicketUpdatePublic, session_id: str) -> TicketResponse | None:
-    query = select(Ticket).where(Ticket.id == ticket_id, Ticket.is_deleted == False)
-    result = await db.execute(query)
-    ticket = result.scalar_one_or_none()
+    update_data = {"notes": ticket_data.notes} if ticket_data.notes is not None else {}
     
-    if not ticket:
-        return None
-    
-    if ticket.session_id != session_id:
+    transition = await transition_ticket(
+        db, ticket_id, update_data, ("waiting",),
+        Ticket.session_id == session_id,
+        error="Невозможно обновить обработанный талон"
+    )
+    if not transition:
         return None
     
-    if ticket_data.notes is not None:
-        ticket.notes = ticket_data.notes
-    
+    ticket, _ = transition
     await db.commit()
-    await db.refresh(ticket)
     return TicketResponse.model_validate(ticket)
 
 
 async def call_ticket(db: AsyncSession, ticket_id: int, notes: str | None = None) -> TicketResponse | None:
-    query = select(Ticket).where(Ticket.id == ticket_id, Ticket.is_deleted == False)
-    result = await db.execute(query)
-    ticket = result.scalar_one_or_none()
+    update_data = {"status": "called", "called_at": datetime.now()}
+    if notes:
+        update_data["notes"] = notes
     
-    if not ticket:
+    transition = await transition_ticket(db, ticket_id, update_data, TICKET_STATUS_TRANSITIONS["called"])
+    if not transition:
         return None
     
-    ticket.status = "called"
-    ticket.called_at = datetime.now()
-    if notes:
-        ticket.notes = notes
+    ticket, old_status = transition
+    await db.commit()
+    queue_load_index.transition(ticket.queue_id, old_status, ticket.status)
+    queue_position_index.transition(ticket.queue_id, ticket.sort_key, old_status, ticket.status)
+    queue_events.publish_change(ticket.queue_id, ticket.sort_key, old_status, ticket.status)
+    
+    await send_call_notification(ticket)
+    return TicketResponse.model_validate(ticket)
+
+
+async def call_next_ticket(db: AsyncSession, queue_id: int) -> TicketResponse | None:
+    """Вызывает ожидающий талон очереди с наименьшей позицией одним запросом.
+
+    FOR UPDATE SKIP LOCKED пропускает талоны, которые прямо сейчас забирают
+    другие операторы, поэтому несколько стоек выбирают талоны из одной
+    очереди, не дожидаясь друг друга, и без двойных вызовов. В том же
+    запросе current_position очереди становится номером вызванного талона,
+    если он больше: талон, перемещенный в начало очереди, или вызовы,
+    закоммиченные не по порядку, не откатывают счетчик назад. Это обновление строки очереди, поэтому одновременные вызовы из одной
+    очереди все же ждут друг друга на нем, но только до коммита, который
+    идет сразу за запросом. Талоны удаленной очереди не вызываются.
+    """
+    next_ticket = select_next_waiting_ticket(queue_id).cte("next_ticket")
+    advance_queue = (
+        update(Queue)
+        .where(Queue.id == next_ticket.c.queue_id)
+        .values(current_position=func.greatest(Queue.current_position, next_ticket.c.position))
+        .cte("advance_queue")
+    )
+    ticket = await db.scalar(
+        update(Ticket)
+        .where(Ticket.id == next_ticket.c.id)
+        .values(status="called", called_at=datetime.now())
+        .returning(Ticket)
+        .add_cte(advance_queue)
+        .execution_options(synchronize_session=False)
+    )
+    
+    if not ticket:
+        queue_exists = await db.scalar(
+            select(Queue.id).where(Queue.id == queue_id, Queue.is_deleted == False)
+        )
+        if not queue_exists:
+            return None
+        raise ValueError("В очереди нет ожидающих талонов")
     
     await db.commit()
-    await db.refresh(ticket)
+    queue_load_index.transition(ticket.queue_id, "waiting", ticket.status)
+    queue_position_index.transition(ticket.queue_id, ticket.sort_key, "waiting", ticket.status)
+    queue_events.publish_change(ticket.queue_id, ticket.sort_key, "waiting", ticket.status)
     
+    await send_call_notification(ticket)
+    return TicketResponse.model_validate(ticket)
+
+
+def select_next_waiting_ticket(queue_id: int):
+    """Следующий ожидающий талон неудаленной очереди с блокировкой строки талона (SKIP LOCKED)"""
+    return (
+        select(Ticket.id, Ticket.queue_id, Ticket.position)
+        .join(Queue, Queue.id == Ticket.queue_id)
+        .where(
+            Ticket.queue_id == queue_id,
+            Ticket.status == WAITING_STATUS,
+            Ticket.is_deleted == False,
+            Queue.is_deleted == False
+        )
+        .order_by(Ticket.sort_key)
+        .limit(1)
+        .with_for_update(of=Ticket, skip_locked=True)
+    )
+
+
+async def send_call_notification(ticket: Ticket) -> None:
     try:
         await notification_manager.send_notification(
             ticket.session_id,
@@ -216,24 +321,21 @@ async def call_ticket(db: AsyncSession, ticket_id: int, notes: str | None = None
         print(f"Call notification sent to {ticket.session_id}")
     except Exception as e:
         print(f"Error sending call notification: {e}")
-    
-    return TicketResponse.model_validate(ticket)
 
 async def complete_ticket(db: AsyncSession, ticket_id: int, notes: str | None = None) -> TicketResponse | None:
-    query = select(Ticket).where(Ticket.id == ticket_id, Ticket.is_deleted == False)
-    result = await db.execute(query)
-    ticket = result.scalar_one_or_none()
+    update_data = {"status": "completed", "completed_at": datetime.now()}
+    if notes:
+        update_data["notes"] = notes
     
-    if not ticket:
+    transition = await transition_ticket(db, ticket_id, update_data, TICKET_STATUS_TRANSITIONS["completed"])
+    if not transition:
         return None
     
-    ticket.status = "completed"
-    ticket.completed_at = datetime.now()
-    if notes:
-        ticket.notes = notes
-    
+    ticket, old_status = transition
     await db.commit()
-    await db.refresh(ticket)
+    queue_load_index.transition(ticket.queue_id, old_status, ticket.status)
+    queue_position_index.transition(ticket.queue_id, ticket.sort_key, old_status, ticket.status)
+    queue_events.publish_change(ticket.queue_id, ticket.sort_key, old_status, ticket.status)
     
     try:
         await notification_manager.send_notification(
@@ -253,79 +355,214 @@ async def complete_ticket(db: AsyncSession, ticket_id: int, notes: str | None =
 
 
 async def cancel_ticket(db: AsyncSession, ticket_id: int, session_id: str | None = None, notes: str | None = None) -> TicketResponse | None:
-    query = select(Ticket).where(Ticket.id == ticket_id, Ticket.is_deleted == False)
-    result = await db.execute(query)
-    ticket = result.scalar_one_or_none()
-    
-    if not ticket:
-        return None
+    update_data = {"status": "cancelled"}
+    if notes:
+        update_data["notes"] = notes
     
-    if session_id and ticket.session_id != session_id:
+    conditions = [Ticket.session_id == session_id] if session_id else []
+    transition = await transition_ticket(db, ticket_id, update_data, TICKET_STATUS_TRANSITIONS["cancelled"], *conditions)
+    if not transition:
         return None
     
-    ticket.status = "cancelled"
-    if notes:
-        ticket.notes = notes
-    
+    ticket, old_status = transition
     await db.commit()
-    await db.refresh(ticket)
+    queue_load_index.transition(ticket.queue_id, old_status, ticket.status)
+    queue_position_index.transition(ticket.queue_id, ticket.sort_key, old_status, ticket.status)
+    queue_events.publish_change(ticket.queue_id, ticket.sort_key, old_status, ticket.status)
     return TicketResponse.model_validate(ticket)
 
 
+async def transition_ticket(
+    db: AsyncSession,
+    ticket_id: int,
+    values: dict,
+    allowed_statuses: tuple[str, ...] | None,
+    *conditions,
+    error: str | None = None
+) -> tuple[Ticket, str] | None:
+    """Изменяет талон одним UPDATE ... RETURNING, если его статус допускает переход.
+
+    Подзапрос с FOR UPDATE блокирует строку и отдает прежний статус, а
+    условие на статус в WHERE проверяется уже после блокировки, поэтому из
+    двух одновременных вызовов одного талона проходит только один.
+    Возвращает талон и его прежний статус, None если талон не найден, и
+    бросает ValueError, если текущий статус не допускает переход. Талон,
+    вернувшийся в ожидание, снова получает уведомления о позиции.
+    """
+    if values.get("status") == "waiting":
+        values = {
+            **values,
+            "notified_bucket": case((Ticket.status != "waiting", None), else_=Ticket.notified_bucket)
+        }
+    
+    previous_ticket = aliased(Ticket)
+    previous = (
+        select(previous_ticket.id, previous_ticket.status)
+        .where(previous_ticket.id == ticket_id)
+        .with_for_update()
+        .subquery("previous")
+    )
+    
+    stmt = (
+        update(Ticket)
+        .where(Ticket.id == previous.c.id, Ticket.is_deleted == False, *conditions)
+        # Пустое изменение все равно проверяет условия и возвращает талон
+        .values(values or {"status": Ticket.status})
+        .returning(Ticket, previous.c.status)
+        .execution_options(synchronize_session=False)
+    )
+    if allowed_statuses is not None:
+        stmt = stmt.where(Ticket.status.in_(allowed_statuses))
+    
+    transition = (await db.execute(stmt)).one_or_none()
+    if transition:
+        return transition.Ticket, transition.status
+    
+    current_status = await db.scalar(
+        select(Ticket.status).where(Ticket.id == ticket_id, Ticket.is_deleted == False, *conditions)
+    )
+    if current_status is None:
+        return None
+    
+    new_status = values.get("status", current_status)
+    raise ValueError(error or f"Недопустимая смена статуса талона: {current_status} → {new_status}")
+
+
 async def move_ticket(db: AsyncSession, ticket_id: int, target_queue_id: int) -> TicketResponse | None:
-    query = select(Ticket).where(Ticket.id == ticket_id, Ticket.is_deleted == False)
+    """Перемещает талон в другую очередь, изменяя O(1) строк.
+
+    Талон получает новый номер из счетчика целевой очереди, а ключ порядка
+    между соседями по времени создания. Номера и ключи остальных талонов
+    не меняются; только если между соседями не осталось свободных ключей,
+    ключи целевой очереди перераспределяются одним запросом.
+
+    Перемещается только ожидающий талон. Строка талона блокируется до
+    коммита, и статус проверяется под блокировкой: талон, который в это
+    время вызывают или отменяют, не вернется в ожидание, а индексы в
+    памяти обновятся по его настоящему статусу.
+    """
+    query = select(Ticket).where(Ticket.id == ticket_id, Ticket.is_deleted == False).with_for_update()
     result = await db.execute(query)
     ticket = result.scalar_one_or_none()
     
     if not ticket:
         return None
     
-    queue_result = await db.execute(
-        select(Queue).where(
-            Queue.id == target_queue_id,
-            Queue.is_deleted == False
-        )
+    if ticket.status != "waiting":
+        raise ValueError("Переместить можно только ожидающий талон")
+    
+    # Выделение номера блокирует строку целевой очереди до коммита,
+    # поэтому параллельные вставки в очередь не выбирают одних и тех же соседей
+    new_position = await db.scalar(
+        update(Queue)
+        .where(Queue.id == target_queue_id, Queue.is_deleted == False)
+        .values(last_position=Queue.last_position + 1)
+        .returning(Queue.last_position)
     )
-    target_queue = queue_result.scalar_one_or_none()
-    if not target_queue:
+    if new_position is None:
         raise ValueError("Целевая очередь не найдена или удалена")
     
-    all_tickets_result = await db.execute(
-        select(Ticket).where(
-            Ticket.queue_id == target_queue_id,
-            Ticket.is_deleted == False
-        ).order_by(Ticket.created_at.asc())
-    )
-    existing_tickets = all_tickets_result.scalars().all()
+    sort_key = await find_sort_key(db, ticket, target_queue_id, new_position)
+    rebalanced = sort_key is None
+    if rebalanced:
+        await rebalance_sort_keys(db, target_queue_id)
+        sort_key = await find_sort_key(db, ticket, target_queue_id, new_position)
     
+    old_queue_id, old_sort_key = ticket.queue_id, ticket.sort_key
     ticket.queue_id = target_queue_id
-    ticket.status = "waiting"
-    all_tickets = list(existing_tickets) + [ticket]
-    
-    all_tickets_sorted = sorted(all_tickets, key=lambda x: x.created_at)
-    
-    for position, t in enumerate(all_tickets_sorted, 1):
-        t.position = position
+    ticket.position = new_position
+    ticket.sort_key = sort_key
+    ticket.notified_bucket = None
     
     await db.commit()
+    # Индексы обновляются записанными значениями и до следующего обращения к
+    # БД: после коммита талон уже могут вызвать, и этот вызов учтет себя сам
+    queue_load_index.move(old_queue_id, target_queue_id, "waiting", "waiting")
+    queue_position_index.move(old_queue_id, old_sort_key, target_queue_id, sort_key, "waiting", "waiting")
+    queue_events.publish_change(old_queue_id, old_sort_key, "waiting", None)
+    if rebalanced:
+        await queue_position_index.refresh_queue(db, target_queue_id)
+        queue_events.publish_reload(target_queue_id)
+    else:
+        queue_events.publish_change(target_queue_id, sort_key, None, "waiting")
     await db.refresh(ticket)
     return TicketResponse.model_validate(ticket)
 
 
+async def find_sort_key(db: AsyncSession, ticket: Ticket, queue_id: int, position: int) -> int | None:
+    """Ключ порядка для вставки талона в очередь по времени создания или None, если между соседями нет места"""
+    previous_key = (
+        select(func.max(Ticket.sort_key))
+        .where(
+            Ticket.queue_id == queue_id,
+            Ticket.is_deleted == False,
+            Ticket.id != ticket.id,
+            tuple_(Ticket.created_at, Ticket.id) < tuple_(ticket.created_at, ticket.id)
+        )
+        .scalar_subquery()
+    )
+    next_key = (
+        select(func.min(Ticket.sort_key))
+        .where(
+            Ticket.queue_id == queue_id,
+            Ticket.is_deleted == False,
+            Ticket.id != ticket.id,
+            or_(previous_key.is_(None), Ticket.sort_key > previous_key)
+        )
+        .scalar_subquery()
+    )
+    neighbours = (await db.execute(select(previous_key, next_key))).one()
+    previous, following = neighbours
+    
+    if following is None:
+        # В конец очереди: ключ по номеру, как у новых талонов
+        return position * SORT_KEY_GAP
+    if previous is None:
+        return following - SORT_KEY_GAP
+    if following - previous > 1:
+        return (previous + following) // 2
+    return None
+
+
+async def rebalance_sort_keys(db: AsyncSession, queue_id: int) -> None:
+    """Равномерно перераспределяет ключи порядка талонов очереди с шагом SORT_KEY_GAP"""
+    ranked = (
+        select(
+            Ticket.id,
+            (func.row_number().over(order_by=(Ticket.sort_key, Ticket.id)) * SORT_KEY_GAP).label("sort_key")
+        )
+        .where(Ticket.queue_id == queue_id, Ticket.is_deleted == False)
+        .subquery()
+    )
+    await db.execute(
+        update(Ticket)
+        .where(Ticket.id == ranked.c.id)
+        .values(sort_key=ranked.c.sort_key)
+        .execution_options(synchronize_session=False)
+    )
+
+
 async def delete_ticket(db: AsyncSession, ticket_id: int, hard_delete: bool = False) -> bool:
-    query = select(Ticket).where(Ticket.id == ticket_id)
+    # Блокировка до коммита: индексы обновляются по статусу, который был у талона при удалении
+    query = select(Ticket).where(Ticket.id == ticket_id).with_for_update()
     result = await db.execute(query)
     ticket = result.scalar_one_or_none()
     
     if not ticket:
         return False
     
+    was_counted = not ticket.is_deleted
     if hard_delete:
         await db.delete(ticket)
     else:
         ticket.is_deleted = True
     
     await db.commit()
+    if was_counted:
+        queue_load_index.remove(ticket.queue_id, ticket.status)
+        if ticket.status == "waiting":
+            queue_position_index.remove(ticket.queue_id, ticket.sort_key)
+        queue_events.publish_change(ticket.queue_id, ticket.sort_key, ticket.status, None)
     return True
 
 
@@ -337,16 +574,7 @@ async def get_ticket_position(db: AsyncSession, ticket_id: int) -> TicketPositio
     if not ticket:
         return None
     
-    result = await db.execute(
-        select(func.count(Ticket.id))
-        .where(
-            Ticket.queue_id == ticket.queue_id,
-            Ticket.position < ticket.position,
-            Ticket.is_deleted == False,
-            Ticket.status == "waiting"
-        )
-    )
-    ahead_count = result.scalar() or 0
+    ahead_count = await queue_position_index.count_ahead(db, ticket.queue_id, ticket.sort_key)
     
     return TicketPositionInfo(
         ticket_id=ticket.id,
@@ -0,0 +1,73 @@
+import asyncpg
+
+from app.core.config import settings
+
+
+class AdvisoryLockLeadership:
+    """Лидерство фоновой задачи на advisory-блокировках Postgres.
+
+    Задача делится на шарды, каждый шард - отдельная сессионная блокировка
+    pg_try_advisory_lock(lock_id, shard) на выделенном соединении. Экземпляр
+    обрабатывает только захваченные шарды и держит не больше своей доли
+    (шарды / число экземпляров), лишние отпускает. Если процесс умирает,
+    соединение закрывается, Postgres снимает блокировки, и на следующем
+    тике их подхватывают оставшиеся экземпляры.
+    """
+
+    def __init__(self, dsn: str, lock_id: int, shards: int = 1):
+        self.dsn = dsn
+        self.lock_id = lock_id
+        self.shards = shards
+        self.application_name = f"tbank-leader-{lock_id}"
+        self.owned: set[int] = set()
+        self._connection: asyncpg.Connection | None = None
+
+    async def acquire(self) -> list[int]:
+        """Проверить удерживаемые шарды, выровнять их число по доле экземпляра и вернуть свои шарды"""
+        try:
+            if self._connection is None or self._connection.is_closed():
+                self.owned = set()
+                self._connection = await asyncpg.connect(
+                    self.dsn,
+                    server_settings={"application_name": self.application_name}
+                )
+
+            # Заодно проверка, что соединение (а с ним и блокировки) живо
+            instances = await self._connection.fetchval(
+                "SELECT count(*) FROM pg_stat_activity WHERE application_name = $1",
+                self.application_name
+            )
+            fair_share = -(-self.shards // max(instances, 1))
+
+            for shard in sorted(self.owned, reverse=True)[:max(len(self.owned) - fair_share, 0)]:
+                await self._connection.fetchval("SELECT pg_advisory_unlock($1, $2)", self.lock_id, shard)
+                self.owned.discard(shard)
+
+            for shard in range(self.shards):
+                if len(self.owned) >= fair_share:
+                    break
+                if shard in self.owned:
+                    continue
+                if await self._connection.fetchval("SELECT pg_try_advisory_lock($1, $2)", self.lock_id, shard):
+                    self.owned.add(shard)
+        except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError) as e:
+            print(f"Leadership connection lost: {e}")
+            await self.release()
+
+        return sorted(self.owned)
+
+    async def release(self) -> None:
+        """Закрыть соединение, освободив все шарды"""
+        self.owned = set()
+        if self._connection is not None and not self._connection.is_closed():
+            self._connection.terminate()
+        self._connection = None
+
+
+POSITION_CHECK_LOCK_ID = 72011
+
+position_check_leadership = AdvisoryLockLeadership(
+    settings.ASYNCPG_DSN,
+    POSITION_CHECK_LOCK_ID,
+    shards=settings.POSITION_CHECK_SHARDS,
+)
@@ -1,45 +1,100 @@
+from sqlalchemy import select, insert, update, func, case, or_
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.services.crud.ticket import get_ticket_position, get_ticket
+from app.db.models import Ticket, Queue
+from app.db.models.notification import Notification
+from app.db.models.ticket import WAITING_STATUS
+from app.services.crud.ticket import get_ticket
 from app.services.crud.notification import create_notification
 from app.schemas.notification import NotificationCreate
 from app.services.websockets.notifications import notification_manager
 
+POSITION_ALERT_BUCKETS = (1, 3, 10)
+
+
+def position_alert_message(ahead_count: int) -> str | None:
+    """Текст уведомления о приближении очереди или None, если уведомлять рано"""
+    if ahead_count <= 1:
+        return "Следующий! Подготовьтесь к вызову."
+    if ahead_count <= 3:
+        return f"Ваша очередь приближается! Перед вами {ahead_count} человек(а)."
+    if ahead_count <= POSITION_ALERT_BUCKETS[-1]:
+        return f"Вы в очереди! Перед вами {ahead_count} человек."
+    return None
+
+
+def crossed_bucket(bucket):
+    """Условие: талон еще не уведомлялся о пороге `bucket` или более близком"""
+    return or_(Ticket.notified_bucket.is_(None), Ticket.notified_bucket > bucket)
+
+
 class NotificationService:
     def __init__(self, db: AsyncSession):
         self.db = db
     
-    async def check_ticket_position(self, ticket_id: int) -> bool:
-        """Проверяет позицию талона и создает нотификации при необходимости"""
-        position_info = await get_ticket_position(self.db, ticket_id)
-        if not position_info:
-            return False
+    async def create_position_alerts(self, shards: list[int] | None = None, total_shards: int = 1) -> int:
+        """Создает уведомления о позиции для талонов, перешедших в новый порог.
         
-        ahead_count = position_info.ahead_count
-        notifications_created = False
+        Количество людей впереди считается одним оконным запросом по всем
+        очередям. Условный UPDATE ... RETURNING отмечает порог у талона и
+        отбирает только пересечения, поэтому повторный обход не дублирует
+        уведомления. Уведомления вставляются одной пачкой с одним коммитом.
         
-        if ahead_count <= 1:
-            await self._create_notification(
-                ticket_id, 
-                "Следующий! Подготовьтесь к вызову.",
-                "position_alert"
+        Если переданы `shards`, обрабатываются только очереди с
+        queue_id % total_shards из этого списка.
+        """
+        queue_filter = []
+        if shards is not None:
+            queue_filter.append((Queue.id % total_shards).in_(shards))
+        
+        ranked = (
+            select(
+                Ticket.id.label("ticket_id"),
+                (func.row_number().over(partition_by=Ticket.queue_id, order_by=Ticket.sort_key) - 1).label("ahead_count")
             )
-            notifications_created = True
-        elif ahead_count <= 3:
-            await self._create_notification(
-                ticket_id, 
-                f"Ваша очередь приближается! Перед вами {ahead_count} человек(а).",
-                "position_alert"
+            .join(Queue)
+            .where(
+                Queue.is_active == True,
+                Queue.is_deleted == False,
+                Ticket.status == WAITING_STATUS,
+                Ticket.is_deleted == False,
+                *queue_filter
             )
-            notifications_created = True
-        elif ahead_count <= 10:
-            await self._create_notification(
-                ticket_id, 
-                f"Вы в очереди! Перед вами {ahead_count} человек.",
-                "position_alert"
+            .subquery()
+        )
+        buckets = (
+            select(
+                ranked.c.ticket_id,
+                ranked.c.ahead_count,
+                case(
+                    *((ranked.c.ahead_count <= bucket, bucket) for bucket in POSITION_ALERT_BUCKETS[:-1]),
+                    else_=POSITION_ALERT_BUCKETS[-1]
+                ).label("bucket")
             )
-            notifications_created = True
+            .where(ranked.c.ahead_count <= POSITION_ALERT_BUCKETS[-1])
+            .subquery()
+        )
+        result = await self.db.execute(
+            update(Ticket)
+            .where(Ticket.id == buckets.c.ticket_id, crossed_bucket(buckets.c.bucket))
+            .values(notified_bucket=buckets.c.bucket)
+            .returning(Ticket.id, Ticket.session_id, buckets.c.ahead_count)
+            .execution_options(synchronize_session=False)
+        )
+        
+        notifications = [
+            {
+                "ticket_id": row.id,
+                "session_id": row.session_id,
+                "message": position_alert_message(row.ahead_count),
+                "notification_type": "position_alert"
+            }
+            for row in result.all()
+        ]
+        if notifications:
+            await self.db.execute(insert(Notification), notifications)
         
-        return notifications_created
+        await self.db.commit()
+        return len(notifications)
     
     async def _create_notification(self, ticket_id: int, message: str, notification_type: str):
         ticket = await get_ticket(self.db, ticket_id)
@@ -0,0 +1,161 @@
+import asyncio
+from typing import Any, Awaitable, Callable
+
+from app.services.websockets.brokers import broker
+
+
+# Изменение одного талона очереди: (ключ порядка, прежний статус, новый статус);
+# None вместо статуса - талона в очереди не было или больше нет
+QueueChange = tuple[int, str | None, str | None]
+
+QueueEventHandler = Callable[[int], Awaitable[None]]
+# Получает изменения талонов очереди или None, если очередь нужно перечитать целиком
+RemoteQueueHandler = Callable[[int, list[QueueChange] | None], Awaitable[None]]
+ResyncHandler = Callable[[], Awaitable[None]]
+
+QUEUE_EVENTS_CHANNEL = "queue_events"
+
+# Сколько изменений талонов пересылать в одном сообщении брокера (лимит размера
+# NOTIFY); при большем числе очереди пересылаются на перечитывание
+MAX_BROKER_CHANGES = 200
+
+
+class QueueEventBus:
+    """События об изменении очередей.
+
+    Издатели (вызов, завершение, отмена, перемещение талонов) только отмечают
+    очередь как измененную и не ждут сети. Единственный потребитель забирает
+    накопленные очереди пачкой: несколько событий по одной очереди
+    схлопываются в один пересчет.
+
+    Локальные изменения пачкой пересылаются через брокер остальным процессам
+    вместе с изменениями талонов, где перед обычными обработчиками
+    вызываются обработчики удаленных изменений (например, обновление
+    индексов в памяти). Сообщения каждого процесса нумеруются; пропуск
+    номера означает потерянные изменения, и тогда вместо применения
+    изменений вызываются обработчики полной сверки.
+    """
+
+    def __init__(self):
+        self._handlers: list[QueueEventHandler] = []
+        self._remote_handlers: list[RemoteQueueHandler] = []
+        self._resync_handlers: list[ResyncHandler] = []
+        self._pending: set[int] = set()
+        self._outgoing: dict[int, list[QueueChange] | None] = {}
+        self._remote: dict[int, list[QueueChange] | None] = {}
+        self._resync = False
+        self._sequence = 0
+        self._remote_sequences: dict[str, int] = {}
+        self._wakeup = asyncio.Event()
+
+    def subscribe(self, handler: QueueEventHandler) -> None:
+        """Зарегистрировать обработчик изменения очереди"""
+        self._handlers.append(handler)
+
+    def subscribe_remote(self, handler: RemoteQueueHandler) -> None:
+        """Зарегистрировать обработчик изменения очереди другим процессом"""
+        self._remote_handlers.append(handler)
+
+    def subscribe_resync(self, handler: ResyncHandler) -> None:
+        """Зарегистрировать обработчик потери изменений от других процессов"""
+        self._resync_handlers.append(handler)
+
+    def publish(self, *queue_ids: int) -> None:
+        """Отметить очереди как измененные без изменения их талонов"""
+        for queue_id in queue_ids:
+            self._merge(self._outgoing, queue_id, [])
+        self._pending.update(queue_ids)
+        self._wakeup.set()
+
+    def publish_change(self, queue_id: int, sort_key: int, old_status: str | None, new_status: str | None) -> None:
+        """Отметить очередь как измененную изменением одного талона"""
+        self._merge(self._outgoing, queue_id, [(sort_key, old_status, new_status)])
+        self._pending.add(queue_id)
+        self._wakeup.set()
+
+    def publish_reload(self, *queue_ids: int) -> None:
+        """Отметить очереди, талоны которых изменены массово: другие процессы перечитают их"""
+        for queue_id in queue_ids:
+            self._merge(self._outgoing, queue_id, None)
+        self._pending.update(queue_ids)
+        self._wakeup.set()
+
+    @staticmethod
+    def _merge(
+        target: dict[int, list[QueueChange] | None],
+        queue_id: int,
+        changes: list[QueueChange] | None
+    ) -> None:
+        if changes is None:
+            target[queue_id] = None
+            return
+        existing = target.setdefault(queue_id, [])
+        if existing is not None:
+            existing.extend(changes)
+
+    async def handle_broker_message(self, payload: dict[str, Any]) -> None:
+        origin = payload["origin"]
+        if origin == broker.node_id:
+            return
+        sequence = payload["sequence"]
+        previous = self._remote_sequences.get(origin)
+        self._remote_sequences[origin] = sequence
+        # Первое сообщение процесса с номером больше 1 тоже пропуск: его
+        # изменения могли закоммититься до того, как этот процесс построил индексы
+        expected = 1 if previous is None else previous + 1
+        if sequence != expected:
+            self._resync = True
+        for queue_id, changes in payload["queues"]:
+            self._merge(self._remote, queue_id, None if changes is None else [tuple(change) for change in changes])
+            self._pending.add(queue_id)
+        self._wakeup.set()
+
+    def _broker_payload(self, outgoing: dict[int, list[QueueChange] | None]) -> dict[str, Any]:
+        self._sequence += 1
+        total = sum(len(changes) for changes in outgoing.values() if changes)
+        queues = [
+            [queue_id, None if total > MAX_BROKER_CHANGES else changes]
+            for queue_id, changes in sorted(outgoing.items())
+        ]
+        return {"origin": broker.node_id, "sequence": self._sequence, "queues": queues}
+
+    async def run(self) -> None:
+        """Цикл единственного потребителя событий"""
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            queue_ids, self._pending = self._pending, set()
+            outgoing, self._outgoing = self._outgoing, {}
+            remote, self._remote = self._remote, {}
+            resync, self._resync = self._resync, False
+
+            if outgoing:
+                try:
+                    await broker.publish(QUEUE_EVENTS_CHANNEL, self._broker_payload(outgoing))
+                except Exception as e:
+                    print(f"Error publishing queue changes: {e}")
+
+            if resync:
+                # Сверка читает БД целиком, включая пришедшие изменения
+                remote = {}
+                for resync_handler in self._resync_handlers:
+                    try:
+                        await resync_handler()
+                    except Exception as e:
+                        print(f"Error resyncing queue changes: {e}")
+
+            for queue_id in queue_ids:
+                if queue_id in remote:
+                    for remote_handler in self._remote_handlers:
+                        try:
+                            await remote_handler(queue_id, remote[queue_id])
+                        except Exception as e:
+                            print(f"Error applying remote queue {queue_id} change: {e}")
+                for handler in self._handlers:
+                    try:
+                        await handler(queue_id)
+                    except Exception as e:
+                        print(f"Error handling queue {queue_id} change: {e}")
+
+
+queue_events = QueueEventBus()
@@ -0,0 +1,116 @@
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Generic, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Сколько раз перечитывать очереди, изменившиеся во время чтения из БД
+RELOAD_ATTEMPTS = 3
+
+T = TypeVar("T")
+
+
+class QueueIndex(ABC, Generic[T]):
+    """Данные каждой очереди в памяти процесса (счетчики, ключи порядка).
+
+    Обновляется из CRUD-операций над талонами после успешного коммита,
+    перестраивается из БД при старте и периодически сверяется с БД.
+
+    Чтения из БД идут по одному под блокировкой. Изменение приходит после
+    коммита, и по нему не понять, попало ли оно в уже прочитанный снимок,
+    поэтому очереди, измененные во время чтения, перечитываются, а не
+    затираются снимком. Наследник читает данные очередей в load и копирует
+    значение очереди в copy.
+    """
+
+    def __init__(self):
+        self._queues: dict[int, T] = {}
+        self.is_ready = False
+        self._lock = asyncio.Lock()
+        # Очереди, измененные во время чтения из БД (None - чтения нет)
+        self._touched: set[int] | None = None
+
+    @abstractmethod
+    async def load(self, db: AsyncSession, queue_ids: list[int] | None = None) -> dict[int, T]:
+        """Актуальные данные всех очередей (или заданных очередей) из БД; пустые очереди можно не возвращать"""
+        pass
+
+    @abstractmethod
+    def copy(self, value: T) -> T:
+        """Независимая копия данных очереди"""
+        pass
+
+    @abstractmethod
+    def empty(self) -> T:
+        """Данные очереди без талонов"""
+        pass
+
+    def drop_queue(self, queue_id: int) -> None:
+        self._touch(queue_id)
+        self._queues.pop(queue_id, None)
+
+    def _touch(self, queue_id: int) -> None:
+        if self._touched is not None:
+            self._touched.add(queue_id)
+
+    async def _load(self, db: AsyncSession, queue_ids: list[int] | None = None) -> dict[int, T]:
+        """Прочитать данные из БД, перечитывая очереди, измененные во время чтения.
+
+        Вызывается под блокировкой. Если очередь меняется при каждом
+        перечитывании, для нее остаются текущие данные в памяти.
+        """
+        scope = None if queue_ids is None else set(queue_ids)
+
+        def take_touched() -> set[int]:
+            touched = self._touched if scope is None else self._touched & scope
+            self._touched = set()
+            return touched
+
+        self._touched = set()
+        try:
+            loaded = await self.load(db, queue_ids)
+            for _ in range(RELOAD_ATTEMPTS):
+                touched = take_touched()
+                if not touched:
+                    return loaded
+                reloaded = await self.load(db, list(touched))
+                for queue_id in touched:
+                    loaded.pop(queue_id, None)
+                    if queue_id in reloaded:
+                        loaded[queue_id] = reloaded[queue_id]
+
+            if self.is_ready:
+                for queue_id in take_touched():
+                    loaded.pop(queue_id, None)
+                    if queue_id in self._queues:
+                        loaded[queue_id] = self.copy(self._queues[queue_id])
+            return loaded
+        finally:
+            self._touched = None
+
+    async def refresh_queue(self, db: AsyncSession, queue_id: int) -> None:
+        """Перечитать данные одной очереди из БД (после ее изменения другим процессом или массового изменения)"""
+        async with self._lock:
+            loaded = await self._load(db, [queue_id])
+            self._queues[queue_id] = loaded.get(queue_id, self.empty())
+
+    async def rebuild(self, db: AsyncSession) -> None:
+        """Построить данные из БД; одновременные вызовы до готовности ждут одно построение"""
+        async with self._lock:
+            if self.is_ready:
+                return
+            self._queues = await self._load(db)
+            self.is_ready = True
+
+    async def reconcile(self, db: AsyncSession) -> list[int]:
+        """Сверяет данные с БД, исправляет расхождения и возвращает ID очередей с расхождениями"""
+        async with self._lock:
+            actual = await self._load(db)
+            drifted = [
+                queue_id
+                for queue_id in set(actual) | set(self._queues)
+                if actual.get(queue_id, self.empty()) != self._queues.get(queue_id, self.empty())
+            ]
+            self._queues = actual
+            self.is_ready = True
+            return drifted
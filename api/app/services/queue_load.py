@@ -0,0 +1,70 @@
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Ticket
+from app.services.queue_index import QueueIndex
+
+
+class QueueLoadIndex(QueueIndex[dict[str, int]]):
+    """Количество талонов по статусам для каждой очереди в памяти процесса.
+
+    Обновляется и перечитывается из БД, как описано в QueueIndex.
+    """
+
+    async def get_counts(self, db: AsyncSession, queue_id: int) -> dict[str, int]:
+        """Счетчики очереди по статусам (только ненулевые)"""
+        if not self.is_ready:
+            await self.rebuild(db)
+        return dict(self._queues.get(queue_id, {}))
+
+    def add(self, queue_id: int, status: str, count: int = 1) -> None:
+        self._touch(queue_id)
+        counts = self._queues.setdefault(queue_id, {})
+        counts[status] = counts.get(status, 0) + count
+
+    def remove(self, queue_id: int, status: str, count: int = 1) -> None:
+        self._touch(queue_id)
+        counts = self._queues.get(queue_id)
+        if not counts or status not in counts:
+            return
+        counts[status] -= count
+        if counts[status] <= 0:
+            del counts[status]
+
+    def transition(self, queue_id: int, old_status: str, new_status: str) -> None:
+        self.move(queue_id, queue_id, old_status, new_status)
+
+    def move(self, old_queue_id: int, new_queue_id: int, old_status: str, new_status: str, count: int = 1) -> None:
+        if old_queue_id == new_queue_id and old_status == new_status:
+            return
+        self.remove(old_queue_id, old_status, count)
+        self.add(new_queue_id, new_status, count)
+
+    async def load(self, db: AsyncSession, queue_ids: list[int] | None = None) -> dict[int, dict[str, int]]:
+        """Актуальные счетчики всех очередей (или заданных очередей) из БД"""
+        result = await db.execute(select_status_counts(queue_ids))
+        counts: dict[int, dict[str, int]] = {}
+        for row_queue_id, status, count in result.all():
+            counts.setdefault(row_queue_id, {})[status] = count
+        return counts
+
+    def copy(self, value: dict[str, int]) -> dict[str, int]:
+        return dict(value)
+
+    def empty(self) -> dict[str, int]:
+        return {}
+
+
+def select_status_counts(queue_ids: list[int] | None = None):
+    """Количество талонов по очередям и статусам"""
+    query = (
+        select(Ticket.queue_id, Ticket.status, func.count(Ticket.id))
+        .where(Ticket.is_deleted == False)
+        .group_by(Ticket.queue_id, Ticket.status)
+    )
+    if queue_ids is not None:
+        query = query.where(Ticket.queue_id.in_(queue_ids))
+    return query
+
+
+queue_load_index = QueueLoadIndex()
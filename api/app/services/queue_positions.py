@@ -0,0 +1,80 @@
+from bisect import bisect_left, insort
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Ticket
+from app.db.models.ticket import WAITING_STATUS
+from app.services.queue_index import QueueIndex
+
+
+class QueuePositionIndex(QueueIndex[list[int]]):
+    """Отсортированные ключи порядка (sort_key) ожидающих талонов каждой очереди в памяти процесса.
+
+    Количество ожидающих перед талоном считается бинарным поиском за O(log n)
+    вместо COUNT(*) по таблице талонов. Обновляется и перечитывается из БД,
+    как описано в QueueIndex.
+    """
+
+    async def count_ahead(self, db: AsyncSession, queue_id: int, sort_key: int) -> int:
+        """Количество ожидающих талонов очереди с ключом порядка меньше заданного"""
+        if not self.is_ready:
+            await self.rebuild(db)
+        return bisect_left(self._queues.get(queue_id, []), sort_key)
+
+    def add(self, queue_id: int, sort_key: int) -> None:
+        self._touch(queue_id)
+        insort(self._queues.setdefault(queue_id, []), sort_key)
+
+    def remove(self, queue_id: int, sort_key: int) -> None:
+        self._touch(queue_id)
+        sort_keys = self._queues.get(queue_id)
+        if not sort_keys:
+            return
+        index = bisect_left(sort_keys, sort_key)
+        if index < len(sort_keys) and sort_keys[index] == sort_key:
+            del sort_keys[index]
+
+    def transition(self, queue_id: int, sort_key: int, old_status: str, new_status: str) -> None:
+        self.move(queue_id, sort_key, queue_id, sort_key, old_status, new_status)
+
+    def move(
+        self,
+        old_queue_id: int,
+        old_sort_key: int,
+        new_queue_id: int,
+        new_sort_key: int,
+        old_status: str,
+        new_status: str
+    ) -> None:
+        if old_status == "waiting":
+            self.remove(old_queue_id, old_sort_key)
+        if new_status == "waiting":
+            self.add(new_queue_id, new_sort_key)
+
+    async def load(self, db: AsyncSession, queue_ids: list[int] | None = None) -> dict[int, list[int]]:
+        """Актуальные ключи порядка ожидающих талонов всех очередей (или заданных очередей) из БД"""
+        query = (
+            select(Ticket.queue_id, Ticket.sort_key)
+            .where(
+                Ticket.is_deleted == False,
+                Ticket.status == WAITING_STATUS
+            )
+            .order_by(Ticket.queue_id, Ticket.sort_key)
+        )
+        if queue_ids is not None:
+            query = query.where(Ticket.queue_id.in_(queue_ids))
+        result = await db.execute(query)
+        waiting: dict[int, list[int]] = {}
+        for row_queue_id, sort_key in result.all():
+            waiting.setdefault(row_queue_id, []).append(sort_key)
+        return waiting
+
+    def copy(self, value: list[int]) -> list[int]:
+        return list(value)
+
+    def empty(self) -> list[int]:
+        return []
+
+
+queue_position_index = QueuePositionIndex()
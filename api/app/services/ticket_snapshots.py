@@ -0,0 +1,132 @@
+import asyncio
+import time
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.schemas.websocket import TicketWebSocketMessage
+from app.services.analytics.ticket_ws import (
+    build_ticket_not_found_message,
+    get_ticket_websocket_snapshot,
+    get_tickets_websocket_data,
+)
+
+# Сколько раз читать талон, если его очередь сбрасывают во время каждой загрузки
+LOAD_ATTEMPTS = 3
+
+
+class TicketSnapshotCache:
+    """Общий для всех сокетов снимок данных талона.
+
+    Одновременные запросы одного талона ждут одну и ту же загрузку из БД,
+    готовый снимок живет TICKET_SNAPSHOT_TTL секунд. События очереди
+    сбрасывают снимки ее талонов, поэтому после изменения состояния
+    каждый талон пересчитывается не более одного раза. Загрузка, во время
+    которой очередь талона изменилась, не возвращает прочитанное: ее
+    результат мог устареть и откатить уже разосланное новое состояние.
+    Просроченные снимки удаляются при обращении к ним, снимки талонов без
+    подписчиков - при отписке последнего.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        # ticket_id -> (момент устаревания, ID очереди, снимок)
+        self._entries: dict[int, tuple[float, int | None, TicketWebSocketMessage]] = {}
+        self._inflight: dict[int, asyncio.Task] = {}
+        # queue_id -> число сбросов снимков очереди
+        self._epochs: dict[int, int] = {}
+
+    async def get(self, ticket_id: int) -> tuple[int | None, TicketWebSocketMessage]:
+        """ID очереди и снимок талона из кэша или из единственной общей загрузки"""
+        entry = self._entries.get(ticket_id)
+        if entry and entry[0] > time.monotonic():
+            return entry[1], entry[2]
+        self._entries.pop(ticket_id, None)
+
+        task = self._inflight.get(ticket_id)
+        if task is None:
+            task = asyncio.create_task(self._load(ticket_id))
+            self._inflight[ticket_id] = task
+            task.add_done_callback(lambda _: self._inflight.pop(ticket_id, None))
+
+        # shield: отключение одного сокета не отменяет загрузку для остальных
+        return await asyncio.shield(task)
+
+    async def get_many(self, ticket_ids: set[int]) -> dict[int, tuple[int | None, TicketWebSocketMessage]]:
+        """ID очередей и снимки нескольких талонов: из кэша, остальные одним запросом на всех.
+
+        Снимки талонов, чью очередь сбросили во время загрузки, не
+        возвращаются: свежие снимки им разошлет событие очереди.
+        """
+        now = time.monotonic()
+        snapshots: dict[int, tuple[int | None, TicketWebSocketMessage]] = {}
+        missing: list[int] = []
+        for ticket_id in ticket_ids:
+            entry = self._entries.get(ticket_id)
+            if entry and entry[0] > now:
+                snapshots[ticket_id] = entry[1], entry[2]
+            else:
+                self._entries.pop(ticket_id, None)
+                missing.append(ticket_id)
+        if not missing:
+            return snapshots
+
+        epochs = dict(self._epochs)
+        async with AsyncSessionLocal() as db:
+            loaded = await get_tickets_websocket_data(db, missing)
+
+        for ticket_id in missing:
+            queue_id, message = loaded.get(ticket_id, (None, None))
+            if message is None:
+                message = build_ticket_not_found_message(ticket_id)
+            if epochs.get(queue_id, 0) == self._epochs.get(queue_id, 0):
+                self._store(ticket_id, queue_id, message)
+                snapshots[ticket_id] = queue_id, message
+        return snapshots
+
+    async def _load(self, ticket_id: int) -> tuple[int | None, TicketWebSocketMessage]:
+        """Прочитать талон, перечитывая его, если очередь сбросили во время загрузки.
+
+        Если очередь сбрасывают во время каждой из LOAD_ATTEMPTS загрузок,
+        возвращается последнее прочитанное без записи в кэш.
+        """
+        for _ in range(LOAD_ATTEMPTS):
+            epochs = dict(self._epochs)
+            async with AsyncSessionLocal() as db:
+                queue_id, message = await get_ticket_websocket_snapshot(db, ticket_id)
+
+            if epochs.get(queue_id, 0) == self._epochs.get(queue_id, 0):
+                self._store(ticket_id, queue_id, message)
+                return queue_id, message
+
+            # Загрузка, начатая до сброса, могла прочитать устаревшие данные:
+            # берем снимок, посчитанный после сброса, или читаем заново
+            entry = self._entries.get(ticket_id)
+            if entry and entry[0] > time.monotonic():
+                return entry[1], entry[2]
+        return queue_id, message
+
+    def _store(self, ticket_id: int, queue_id: int | None, message: TicketWebSocketMessage) -> None:
+        self._entries[ticket_id] = (time.monotonic() + self.ttl, queue_id, message)
+
+    def evict(self, ticket_id: int) -> None:
+        """Удалить снимок талона (у талона не осталось подписчиков)"""
+        self._entries.pop(ticket_id, None)
+
+    def prime(self, snapshots: dict[int, tuple[int, TicketWebSocketMessage]]) -> None:
+        """Положить в кэш уже посчитанные снимки талонов: ticket_id -> (ID очереди, снимок)"""
+        for ticket_id, (queue_id, message) in snapshots.items():
+            self._store(ticket_id, queue_id, message)
+
+    def invalidate_queue(self, queue_id: int) -> None:
+        """Сбросить снимки талонов очереди"""
+        self._epochs[queue_id] = self._epochs.get(queue_id, 0) + 1
+        stale = [
+            ticket_id
+            for ticket_id, (_, entry_queue_id, _) in self._entries.items()
+            if entry_queue_id == queue_id
+        ]
+        for ticket_id in stale:
+            del self._entries[ticket_id]
+
+
+ticket_snapshot_cache = TicketSnapshotCache(ttl=settings.TICKET_SNAPSHOT_TTL)
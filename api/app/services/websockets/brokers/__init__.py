@@ -0,0 +1,16 @@
+from app.core.config import settings
+from .base import BaseBroker
+from .memory import InMemoryBroker
+from .postgres import PostgresBroker
+
+
+def create_broker(backend: str) -> BaseBroker:
+    """Создать брокер по имени бэкенда из настроек"""
+    if backend == "memory":
+        return InMemoryBroker()
+    if backend == "postgres":
+        return PostgresBroker(settings.ASYNCPG_DSN)
+    raise ValueError(f"Unknown WebSocket broker: {backend}")
+
+
+broker = create_broker(settings.WS_BROKER)
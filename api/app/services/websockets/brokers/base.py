@@ -0,0 +1,41 @@
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable
+from uuid import uuid4
+
+
+BrokerHandler = Callable[[dict[str, Any]], Awaitable[None]]
+
+
+class BaseBroker(ABC):
+    """Шина сообщений между процессами API.
+
+    Менеджеры WebSocket публикуют сообщения в канал брокера, а каждый процесс
+    доставляет полученные сообщения своим локальным соединениям.
+    """
+
+    def __init__(self):
+        self.node_id = uuid4().hex
+        self._handlers: dict[str, list[BrokerHandler]] = {}
+
+    def subscribe(self, channel: str, handler: BrokerHandler) -> None:
+        """Зарегистрировать обработчик сообщений канала (до вызова start)"""
+        self._handlers.setdefault(channel, []).append(handler)
+
+    async def dispatch(self, channel: str, message: dict[str, Any]) -> None:
+        """Передать сообщение локальным обработчикам канала"""
+        for handler in self._handlers.get(channel, []):
+            try:
+                await handler(message)
+            except Exception as e:
+                print(f"Error handling broker message on {channel}: {e}")
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    @abstractmethod
+    async def publish(self, channel: str, message: dict[str, Any]) -> None:
+        """Опубликовать сообщение для всех процессов"""
+        pass
@@ -0,0 +1,10 @@
+from typing import Any
+
+from .base import BaseBroker
+
+
+class InMemoryBroker(BaseBroker):
+    """Брокер для запуска в одном процессе: сообщения сразу уходят локальным обработчикам"""
+
+    async def publish(self, channel: str, message: dict[str, Any]) -> None:
+        await self.dispatch(channel, message)
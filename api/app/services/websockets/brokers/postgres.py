@@ -0,0 +1,79 @@
+import asyncio
+import json
+from typing import Any
+
+import asyncpg
+
+from app.core.encoding import encode_json
+
+from .base import BaseBroker
+
+
+class PostgresBroker(BaseBroker):
+    """Брокер поверх LISTEN/NOTIFY существующего Postgres.
+
+    Слушает каналы на выделенном соединении и переподключается при его
+    потере. Уведомления обрабатываются по одному в порядке получения.
+    Размер сообщения ограничен лимитом NOTIFY (около 8000 байт).
+    """
+
+    RECONNECT_DELAY = 1.0
+    MAX_RECONNECT_DELAY = 30.0
+
+    def __init__(self, dsn: str):
+        super().__init__()
+        self.dsn = dsn
+        self._listener: asyncpg.Connection | None = None
+        self._publisher: asyncpg.Pool | None = None
+        self._inbox: asyncio.Queue[tuple[str, str]] = asyncio.Queue()
+        self._consumer: asyncio.Task | None = None
+        self._closing = False
+
+    async def start(self) -> None:
+        self._publisher = await asyncpg.create_pool(self.dsn, min_size=1, max_size=2)
+        await self._listen()
+        self._consumer = asyncio.create_task(self._consume())
+
+    async def stop(self) -> None:
+        self._closing = True
+        if self._consumer:
+            self._consumer.cancel()
+        if self._listener:
+            await self._listener.close()
+        if self._publisher:
+            await self._publisher.close()
+
+    async def publish(self, channel: str, message: dict[str, Any]) -> None:
+        if self._publisher is None:
+            raise RuntimeError("Брокер не запущен")
+        await self._publisher.execute("SELECT pg_notify($1, $2)", channel, encode_json(message).decode())
+
+    async def _listen(self) -> None:
+        self._listener = await asyncpg.connect(self.dsn)
+        self._listener.add_termination_listener(self._on_terminated)
+        for channel in self._handlers:
+            await self._listener.add_listener(channel, self._on_notify)
+
+    def _on_notify(self, connection: asyncpg.Connection, pid: int, channel: str, payload: str) -> None:
+        self._inbox.put_nowait((channel, payload))
+
+    def _on_terminated(self, connection: asyncpg.Connection) -> None:
+        if not self._closing:
+            asyncio.create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        delay = self.RECONNECT_DELAY
+        while not self._closing:
+            try:
+                await self._listen()
+                print("Broker listener reconnected")
+                return
+            except Exception as e:
+                print(f"Broker listener reconnect failed: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.MAX_RECONNECT_DELAY)
+
+    async def _consume(self) -> None:
+        while True:
+            channel, payload = await self._inbox.get()
+            await self.dispatch(channel, json.loads(payload))
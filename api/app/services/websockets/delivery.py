@@ -0,0 +1,196 @@
+import asyncio
+import time
+from collections import OrderedDict
+from itertools import count
+from typing import Any, Hashable
+
+from fastapi import WebSocket, status
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.core.encoding import encode_json
+from app.core.metrics import ws_delivery_histogram
+
+Message = dict[str, Any] | BaseModel | str
+
+
+def encode_frame(message: Message) -> str:
+    """Закодировать сообщение в текст кадра; строки (ping, pong, готовые кадры) передаются как есть"""
+    if isinstance(message, str):
+        return message
+    return encode_json(message).decode()
+
+
+# Ссылки на фоновые задачи закрытия, чтобы их не собрал сборщик мусора
+_closing: set[asyncio.Task] = set()
+
+
+async def _close(websocket: WebSocket, code: int) -> None:
+    try:
+        await asyncio.wait_for(websocket.close(code=code), timeout=settings.WS_SEND_TIMEOUT)
+    except Exception:
+        pass
+
+
+def close_quietly(websocket: WebSocket, code: int = status.WS_1013_TRY_AGAIN_LATER) -> None:
+    """Закрыть соединение в фоне, не дожидаясь клиента и не поднимая ошибок"""
+    task = asyncio.create_task(_close(websocket, code))
+    _closing.add(task)
+    task.add_done_callback(_closing.discard)
+
+
+class Outbox:
+    """Исходящая очередь соединения с выделенной задачей-писателем.
+
+    Производители только кладут сообщение в очередь и не ждут сети. Очередь
+    ограничена `max_size` сообщениями: если клиент не успевает ее разбирать,
+    соединение закрывается. Сообщение с ключом `key` заменяет еще не
+    отправленное сообщение с тем же ключом и встает в конец очереди, поэтому
+    отстающий клиент получает только последнее состояние (например, позицию
+    талона), а не всю историю изменений, и не раньше сообщений, поставленных
+    после замененного.
+
+    В очереди лежат уже закодированные кадры. Каждая отправка ограничена
+    WS_SEND_TIMEOUT; время от постановки в очередь до отправки пишется
+    в ws_delivery_histogram.
+    """
+
+    def __init__(self, websocket: WebSocket, max_size: int):
+        self.websocket = websocket
+        self.max_size = max_size
+        self.closed = False
+        self._queue: OrderedDict[Hashable, tuple[str, float, asyncio.Future | None]] = OrderedDict()
+        self._sequence = count()
+        self._ready = asyncio.Event()
+        self._writer = asyncio.create_task(self._run())
+
+    def pending(self, key: Hashable) -> bool:
+        """Есть ли в очереди неотправленное сообщение с ключом `key`"""
+        return key in self._queue
+
+    def put(self, frame: str, key: Hashable | None = None) -> bool:
+        """Поставить кадр в очередь; False, если соединение закрыто или переполнено"""
+        return self._put(frame, key, None)
+
+    async def send(self, frame: str) -> None:
+        """Поставить кадр в очередь и дождаться его отправки"""
+        done = asyncio.get_running_loop().create_future()
+        if not self._put(frame, None, done):
+            raise ConnectionError("Outbox is closed")
+        await done
+
+    def close(self, code: int | None = None) -> None:
+        """Остановить писателя; с `code` - еще и закрыть соединение"""
+        if self.closed:
+            return
+        self.closed = True
+        for _, _, done in self._queue.values():
+            if done is not None and not done.done():
+                done.set_exception(ConnectionError("Outbox is closed"))
+        self._queue.clear()
+        if self._writer is not asyncio.current_task():
+            self._writer.cancel()
+        if code is not None:
+            close_quietly(self.websocket, code)
+
+    def _put(self, frame: str, key: Hashable | None, done: asyncio.Future | None) -> bool:
+        if self.closed:
+            return False
+        if key is not None and key in self._queue:
+            self._queue[key] = (frame, time.perf_counter(), None)
+            self._queue.move_to_end(key)
+            return True
+        if len(self._queue) >= self.max_size:
+            self.close(status.WS_1013_TRY_AGAIN_LATER)
+            return False
+
+        self._queue[next(self._sequence) if key is None else key] = (frame, time.perf_counter(), done)
+        self._ready.set()
+        return True
+
+    async def _run(self) -> None:
+        try:
+            while True:
+                await self._ready.wait()
+                while self._queue:
+                    _, (frame, enqueued_at, done) = self._queue.popitem(last=False)
+                    await asyncio.wait_for(self.websocket.send_text(frame), timeout=settings.WS_SEND_TIMEOUT)
+                    ws_delivery_histogram.observe(time.perf_counter() - enqueued_at)
+                    if done is not None and not done.done():
+                        done.set_result(None)
+                self._ready.clear()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.close(status.WS_1013_TRY_AGAIN_LATER)
+
+
+outboxes: dict[WebSocket, Outbox] = {}
+
+
+def open_outbox(websocket: WebSocket) -> Outbox:
+    """Создать исходящую очередь для принятого соединения"""
+    outbox = outboxes.get(websocket)
+    if outbox is None or outbox.closed:
+        outbox = outboxes[websocket] = Outbox(websocket, settings.WS_OUTBOX_SIZE)
+    return outbox
+
+
+def close_outbox(websocket: WebSocket, code: int | None = None) -> None:
+    """Остановить писателя соединения; с `code` - еще и закрыть соединение"""
+    outbox = outboxes.pop(websocket, None)
+    if outbox is not None:
+        outbox.close(code)
+    elif code is not None:
+        close_quietly(websocket, code)
+
+
+def enqueue(websocket: WebSocket, message: Message, key: Hashable | None = None) -> bool:
+    """Поставить сообщение в очередь соединения, не дожидаясь отправки"""
+    outbox = outboxes.get(websocket)
+    return outbox is not None and outbox.put(encode_frame(message), key)
+
+
+async def send(websocket: WebSocket, message: Message) -> None:
+    """Отправить сообщение через очередь соединения и дождаться отправки"""
+    outbox = outboxes.get(websocket)
+    if outbox is None:
+        raise ConnectionError("Outbox is closed")
+    await outbox.send(encode_frame(message))
+
+
+def fan_out(
+    connections: list[WebSocket],
+    message: Message,
+    key: Hashable | None = None,
+    supersede: Message | None = None
+) -> set[WebSocket]:
+    """Поставить сообщение в очереди всех соединений.
+
+    Сообщение кодируется один раз, всем получателям уходит один и тот же
+    кадр. Не ждет сети: медленные клиенты разбирают свои очереди сами, а их
+    писатели закрывают соединение по таймауту. Возвращает соединения, чьи
+    очереди уже закрыты или переполнены, чтобы вызывающий убрал их из своих
+    подписок.
+
+    Если у соединения еще не отправлено сообщение с тем же ключом и передан
+    `supersede`, вместо `message` в очередь встает `supersede`: так дельта,
+    вытесняющая неотправленную дельту, заменяется полным снимком.
+    """
+    frame = encode_frame(message)
+    superseding_frame = None
+    failed = set()
+    for connection in connections:
+        outbox = outboxes.get(connection)
+        if outbox is None:
+            failed.add(connection)
+            continue
+
+        connection_frame = frame
+        if supersede is not None and outbox.pending(key):
+            if superseding_frame is None:
+                superseding_frame = encode_frame(supersede)
+            connection_frame = superseding_frame
+        if not outbox.put(connection_frame, key):
+            failed.add(connection)
+    return failed
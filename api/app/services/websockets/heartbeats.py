@@ -0,0 +1,90 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+from fastapi import WebSocket
+
+from app.core.config import settings
+from app.services.ticket_snapshots import ticket_snapshot_cache
+from app.services.websockets.delivery import enqueue
+from app.services.websockets.managers import manager_factory
+
+T = TypeVar("T", bound=Hashable)
+
+
+class TimerWheel(Generic[T]):
+    """Хешированное колесо таймеров: одна задача вместо таймера на каждое соединение.
+
+    Интервал делится на `slots` слотов. Элемент попадает в слот по своему
+    хешу и срабатывает раз за оборот колеса, поэтому срабатывания равномерно
+    распределены по интервалу, даже если все соединения открылись разом.
+    Каждый тик обработчик получает весь слот одной пачкой.
+    """
+
+    def __init__(self, interval: float, slots: int, handler: Callable[[list[T]], Awaitable[None]]):
+        self.tick = interval / slots
+        self.handler = handler
+        self._slots: list[set[T]] = [set() for _ in range(slots)]
+        self._position = 0
+
+    def __len__(self) -> int:
+        return sum(len(slot) for slot in self._slots)
+
+    def add(self, item: T) -> None:
+        self._slots[hash(item) % len(self._slots)].add(item)
+
+    def discard(self, item: T) -> None:
+        self._slots[hash(item) % len(self._slots)].discard(item)
+
+    async def run(self) -> None:
+        """Цикл колеса; тики отсчитываются от старта, поэтому долгая пачка не сдвигает расписание"""
+        next_tick = time.monotonic()
+        while True:
+            next_tick += self.tick
+            await asyncio.sleep(max(next_tick - time.monotonic(), 0))
+
+            batch = list(self._slots[self._position])
+            self._position = (self._position + 1) % len(self._slots)
+            if not batch:
+                continue
+            try:
+                await self.handler(batch)
+            except Exception as e:
+                print(f"Error handling timer wheel tick: {e}")
+
+
+async def refresh_ticket_connections(connections: list[tuple[WebSocket, int]]) -> None:
+    """Страховочная сверка талонов слота и heartbeat его соединениям.
+
+    Талоны слота, которых нет в кэше снимков, читаются одним запросом, и
+    каждый сверяется один раз, сколько бы соединений на него ни было
+    подписано: изменения уходят дельтой всем подписчикам. Если сверка не
+    удалась, heartbeat все равно уходит с последней известной версией.
+    Соединения, чья исходящая очередь уже закрыта (клиент не отвечает или
+    не успевает), убираются из колеса и подписок.
+    """
+    ticket_manager = manager_factory.get_manager("tickets")
+    try:
+        snapshots = await ticket_snapshot_cache.get_many({ticket_id for _, ticket_id in connections})
+    except Exception as e:
+        print(f"Error loading ticket snapshots for heartbeats: {e}")
+        snapshots = {}
+
+    for ticket_id, (queue_id, snapshot) in snapshots.items():
+        try:
+            ticket_manager.publish_ticket_state(ticket_id, queue_id, snapshot)
+        except Exception as e:
+            print(f"Error refreshing ticket {ticket_id}: {e}")
+
+    for websocket, ticket_id in connections:
+        heartbeat = ticket_manager.get_ticket_heartbeat(ticket_id)
+        if heartbeat is None or not enqueue(websocket, heartbeat):
+            ticket_heartbeats.discard((websocket, ticket_id))
+            ticket_manager.unsubscribe_from_entity(websocket, ticket_id)
+
+
+ticket_heartbeats: TimerWheel[tuple[WebSocket, int]] = TimerWheel(
+    settings.TICKET_WS_REFRESH_INTERVAL,
+    settings.TICKET_WS_HEARTBEAT_SLOTS,
+    refresh_ticket_connections,
+)
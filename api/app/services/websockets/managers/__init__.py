@@ -1,10 +1,16 @@
+import asyncio
+
 from .ticket import TicketConnectionManager
+from .queue import QueueConnectionManager
+from .event import EventConnectionManager
 from .base import BaseConnectionManager
 
 class WebSocketManagerFactory:
     def __init__(self):
         self._managers: dict[str, BaseConnectionManager] = {
             "tickets": TicketConnectionManager(),
+            "queues": QueueConnectionManager(),
+            "events": EventConnectionManager(),
         }
 
     def get_manager(self, entity_type: str) -> BaseConnectionManager:
@@ -14,10 +20,12 @@ class WebSocketManagerFactory:
         return self._managers[entity_type]
 
     async def notify_all_managers(self, message: dict[str, object]) -> None:
-        """Отправить сообщение во все каналы всех менеджеров"""
-        for manager in self._managers.values():
-            for channel in manager.active_connections:
-                await manager.broadcast_to_channel(message, channel)
+        """Отправить сообщение во все каналы всех менеджеров (параллельно)"""
+        await asyncio.gather(*(
+            manager.broadcast_to_channel(message, channel)
+            for manager in self._managers.values()
+            for channel in list(manager.active_connections)
+        ))
 
 
 manager_factory = WebSocketManagerFactory()
\ No newline at end of file
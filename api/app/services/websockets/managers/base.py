@@ -2,6 +2,8 @@ from typing import Any
 from fastapi import WebSocket
 from abc import ABC, abstractmethod
 
+from app.services.websockets.delivery import close_outbox, enqueue, fan_out, open_outbox
+
 
 class BaseConnectionManager(ABC):
     def __init__(self):
@@ -10,12 +12,14 @@ class BaseConnectionManager(ABC):
     async def connect(self, websocket: WebSocket, channel: str) -> None:
         """Базовый метод подключения к каналу"""
         await websocket.accept()
+        open_outbox(websocket)
         if channel not in self.active_connections:
             self.active_connections[channel] = set()
         self.active_connections[channel].add(websocket)
 
     def disconnect(self, websocket: WebSocket, channel: str) -> None:
         """Базовый метод отключения от канала"""
+        close_outbox(websocket)
         if channel in self.active_connections:
             self.active_connections[channel].discard(websocket)
             if not self.active_connections[channel]:
@@ -23,20 +27,14 @@ class BaseConnectionManager(ABC):
 
     async def send_personal_message(self, message: str, websocket: WebSocket) -> None:
         """Отправить сообщение конкретному соединению"""
-        await websocket.send_text(message)
+        enqueue(websocket, message)
 
     async def broadcast_to_channel(self, message: dict[str, Any], channel: str) -> None:
-        """Отправить сообщение всем в канале"""
+        """Отправить сообщение всем в канале через их исходящие очереди"""
         if channel not in self.active_connections:
             return
 
-        disconnected: set[WebSocket] = set()
-        for connection in self.active_connections[channel]:
-            try:
-                await connection.send_json(message)
-            except Exception:
-                disconnected.add(connection)
-        
+        disconnected = fan_out(list(self.active_connections[channel]), message)
         for connection in disconnected:
             self.disconnect(connection, channel)
 
@@ -0,0 +1,49 @@
+from typing import Any, Hashable
+from fastapi import WebSocket
+from pydantic import BaseModel
+from .base import BaseConnectionManager
+from app.services.websockets.delivery import close_outbox, fan_out, open_outbox
+
+
+class EventConnectionManager(BaseConnectionManager):
+    """Подписки табло на все очереди мероприятия"""
+
+    def __init__(self):
+        super().__init__()
+        self.event_subscriptions: dict[int, set[WebSocket]] = {}
+
+    async def subscribe_to_entity(self, websocket: WebSocket, event_id: int) -> None:
+        await websocket.accept()
+        open_outbox(websocket)
+        if event_id not in self.event_subscriptions:
+            self.event_subscriptions[event_id] = set()
+        self.event_subscriptions[event_id].add(websocket)
+
+    def unsubscribe_from_entity(self, websocket: WebSocket, event_id: int) -> None:
+        close_outbox(websocket)
+        if event_id in self.event_subscriptions:
+            self.event_subscriptions[event_id].discard(websocket)
+            if not self.event_subscriptions[event_id]:
+                del self.event_subscriptions[event_id]
+
+    async def notify_entity_subscribers(
+        self,
+        event_id: int,
+        message: dict[str, Any] | BaseModel,
+        key: Hashable | None = None
+    ) -> None:
+        """Разослать подписчикам мероприятия; `key` - ключ схлопывания (например, очередь сообщения)"""
+        if event_id not in self.event_subscriptions:
+            return
+
+        disconnected = fan_out(list(self.event_subscriptions[event_id]), message, key=key)
+        for connection in disconnected:
+            self.unsubscribe_from_entity(connection, event_id)
+
+    async def get_subscribed_events(self) -> list[int]:
+        """Получить список мероприятий с активными подписками"""
+        return list(self.event_subscriptions.keys())
+
+    def get_connections_count(self) -> int:
+        """Получить количество соединений, подписанных на мероприятия"""
+        return sum(len(connections) for connections in self.event_subscriptions.values())
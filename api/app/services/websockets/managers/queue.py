@@ -0,0 +1,44 @@
+from typing import Any
+from fastapi import WebSocket
+from pydantic import BaseModel
+from .base import BaseConnectionManager
+from app.services.websockets.delivery import close_outbox, fan_out, open_outbox
+
+
+class QueueConnectionManager(BaseConnectionManager):
+    """Подписки табло и пультов операторов на состояние очереди"""
+
+    def __init__(self):
+        super().__init__()
+        self.queue_subscriptions: dict[int, set[WebSocket]] = {}
+
+    async def subscribe_to_entity(self, websocket: WebSocket, queue_id: int) -> None:
+        await websocket.accept()
+        open_outbox(websocket)
+        if queue_id not in self.queue_subscriptions:
+            self.queue_subscriptions[queue_id] = set()
+        self.queue_subscriptions[queue_id].add(websocket)
+
+    def unsubscribe_from_entity(self, websocket: WebSocket, queue_id: int) -> None:
+        close_outbox(websocket)
+        if queue_id in self.queue_subscriptions:
+            self.queue_subscriptions[queue_id].discard(websocket)
+            if not self.queue_subscriptions[queue_id]:
+                del self.queue_subscriptions[queue_id]
+
+    async def notify_entity_subscribers(self, queue_id: int, message: dict[str, Any] | BaseModel) -> None:
+        if queue_id not in self.queue_subscriptions:
+            return
+
+        # Каждое сообщение - полное состояние очереди, поэтому неотправленное предыдущее можно заменить
+        disconnected = fan_out(list(self.queue_subscriptions[queue_id]), message, key=("queue", queue_id))
+        for connection in disconnected:
+            self.unsubscribe_from_entity(connection, queue_id)
+
+    async def get_subscribed_queues(self) -> list[int]:
+        """Получить список очередей с активными подписками"""
+        return list(self.queue_subscriptions.keys())
+
+    def get_connections_count(self) -> int:
+        """Получить количество соединений, подписанных на очереди"""
+        return sum(len(connections) for connections in self.queue_subscriptions.values())
@@ -1,43 +1,138 @@
 from typing import Any
 from fastapi import WebSocket
+from pydantic import BaseModel
 from .base import BaseConnectionManager
+from app.schemas.websocket import (
+    TicketDeltaMessage,
+    TicketHeartbeatMessage,
+    TicketSnapshotMessage,
+    TicketWebSocketMessage,
+)
+from app.services.ticket_snapshots import ticket_snapshot_cache
+from app.services.websockets.delivery import close_outbox, fan_out, open_outbox
 
 
 class TicketConnectionManager(BaseConnectionManager):
+    """Подписки на талоны и версионированный протокол обновлений.
+
+    Для каждого талона с подписчиками хранится последний разосланный снимок
+    и его версия. Новый подписчик получает полный снимок с версией, дальше
+    рассылаются только изменившиеся поля (ticket_delta) с версией +1. Если
+    ничего не изменилось, соединение получает heartbeat с текущей версией.
+    Клиент, увидевший пропуск версии, отправляет resync и получает полный
+    снимок. Дельты до первого снимка и с версией не выше версии снимка
+    клиент пропускает. Версии кадров талона в соединении не убывают:
+    замененная в исходящей очереди дельта встает после уже поставленных
+    heartbeat.
+    """
+
     def __init__(self):
         super().__init__()
         self.ticket_subscriptions: dict[int, set[WebSocket]] = {}
+        # ticket_id -> (версия, последний разосланный снимок)
+        self.ticket_states: dict[int, tuple[int, TicketWebSocketMessage]] = {}
+        # queue_id -> талоны очереди с подписчиками и обратная связь ticket_id -> queue_id
+        self.queue_tickets: dict[int, set[int]] = {}
+        self.ticket_queues: dict[int, int] = {}
 
     async def subscribe_to_entity(self, websocket: WebSocket, ticket_id: int) -> None:
         await websocket.accept()
+        open_outbox(websocket)
         if ticket_id not in self.ticket_subscriptions:
             self.ticket_subscriptions[ticket_id] = set()
         self.ticket_subscriptions[ticket_id].add(websocket)
 
     def unsubscribe_from_entity(self, websocket: WebSocket, ticket_id: int) -> None:
+        close_outbox(websocket)
         if ticket_id in self.ticket_subscriptions:
             self.ticket_subscriptions[ticket_id].discard(websocket)
             if not self.ticket_subscriptions[ticket_id]:
                 del self.ticket_subscriptions[ticket_id]
+                self.ticket_states.pop(ticket_id, None)
+                self._set_ticket_queue(ticket_id, None)
+                ticket_snapshot_cache.evict(ticket_id)
+
+    async def notify_entity_subscribers(self, ticket_id: int, message: dict[str, Any] | BaseModel) -> None:
+        if ticket_id not in self.ticket_subscriptions:
+            return
+
+        disconnected = fan_out(list(self.ticket_subscriptions[ticket_id]), message)
+        for connection in disconnected:
+            self.unsubscribe_from_entity(connection, ticket_id)
+
+    def publish_ticket_state(self, ticket_id: int, queue_id: int | None, data: TicketWebSocketMessage) -> None:
+        """Запомнить новый снимок и очередь талона и разослать подписчикам дельту, если снимок изменился.
 
-    async def notify_entity_subscribers(self, ticket_id: int, message: dict[str, Any]) -> None:
+        Очередь запоминается для get_queue_tickets; None - талона нет. Дельта и снимок идут в исходящие очереди под ключом талона. Если у
+        соединения предыдущее обновление еще не отправлено, вместо дельты
+        встает полный снимок, поэтому отставший клиент не теряет версии.
+        """
         if ticket_id not in self.ticket_subscriptions:
             return
 
-        disconnected: set[WebSocket] = set()
-        for connection in self.ticket_subscriptions[ticket_id]:
-            try:
-                await connection.send_json(message)
-            except Exception:
-                disconnected.add(connection)
-      
+        self._set_ticket_queue(ticket_id, queue_id)
+        state = self.ticket_states.get(ticket_id)
+        if state is None:
+            self.ticket_states[ticket_id] = (1, data)
+            return
+
+        version, previous = state
+        previous_fields = previous.model_dump()
+        changes = {
+            field: value
+            for field, value in data.model_dump().items()
+            if previous_fields.get(field) != value
+        }
+        if not changes:
+            return
+
+        version += 1
+        self.ticket_states[ticket_id] = (version, data)
+        disconnected = fan_out(
+            list(self.ticket_subscriptions[ticket_id]),
+            TicketDeltaMessage(ticket_id=ticket_id, version=version, changes=changes),
+            key=("ticket", ticket_id),
+            supersede=self.get_ticket_snapshot(ticket_id),
+        )
         for connection in disconnected:
             self.unsubscribe_from_entity(connection, ticket_id)
 
+    def get_ticket_snapshot(self, ticket_id: int) -> TicketSnapshotMessage | None:
+        """Полный снимок талона с текущей версией"""
+        state = self.ticket_states.get(ticket_id)
+        if state is None:
+            return None
+        version, data = state
+        return TicketSnapshotMessage(**data.model_dump(), version=version)
+
+    def get_ticket_heartbeat(self, ticket_id: int) -> TicketHeartbeatMessage | None:
+        """Кадр «без изменений» с текущей версией снимка"""
+        state = self.ticket_states.get(ticket_id)
+        if state is None:
+            return None
+        return TicketHeartbeatMessage(ticket_id=ticket_id, version=state[0])
+
+    def _set_ticket_queue(self, ticket_id: int, queue_id: int | None) -> None:
+        previous = self.ticket_queues.get(ticket_id)
+        if previous == queue_id:
+            return
+        if previous is not None:
+            del self.ticket_queues[ticket_id]
+            self.queue_tickets[previous].discard(ticket_id)
+            if not self.queue_tickets[previous]:
+                del self.queue_tickets[previous]
+        if queue_id is not None:
+            self.ticket_queues[ticket_id] = queue_id
+            self.queue_tickets.setdefault(queue_id, set()).add(ticket_id)
+
+    def get_queue_tickets(self, queue_id: int) -> list[int]:
+        """Талоны очереди с активными подписками"""
+        return list(self.queue_tickets.get(queue_id, ()))
+
     async def get_subscribed_tickets(self) -> list[int]:
         """Получить список талонов с активными подписками"""
         return list(self.ticket_subscriptions.keys())
 
     async def get_ticket_subscribers_count(self, ticket_id: int) -> int:
         """Получить количество подписчиков талона"""
-        return len(self.ticket_subscriptions.get(ticket_id, set()))
\ No newline at end of file
+        return len(self.ticket_subscriptions.get(ticket_id, set()))
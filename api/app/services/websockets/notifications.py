@@ -1,58 +1,106 @@
-from fastapi import WebSocket, WebSocketDisconnect
+from uuid import uuid4
+from fastapi import WebSocket, WebSocketDisconnect, status
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
 from app.db.session import AsyncSessionLocal
-from app.services.crud.notification import get_unsent_notifications, mark_notification_sent
+from app.services.crud.notification import get_unsent_notifications, mark_notifications_sent
+from app.services.websockets.brokers import broker
+from app.services.websockets.delivery import close_outbox, enqueue, fan_out, open_outbox, send
+
+NOTIFICATIONS_CHANNEL = "ws_notifications"
 
 class NotificationManager:
-    def __init__(self):
-        self.active_connections = {}
+    """Соединения уведомлений по сессиям.
+    
+    У сессии может быть несколько соединений (вкладки, переподключения), каждое
+    под своим connection_id. Их не больше `max_connections_per_session`: при
+    превышении закрывается самое старое.
+    """
+    
+    def __init__(self, max_connections_per_session: int):
+        self.max_connections_per_session = max_connections_per_session
+        self.active_connections: dict[str, dict[str, WebSocket]] = {}
 
-    async def connect(self, websocket: WebSocket, session_id: str):
+    async def connect(self, websocket: WebSocket, session_id: str) -> str:
         await websocket.accept()
-        self.active_connections[session_id] = websocket
-        print(f"WebSocket connected: {session_id}")
+        open_outbox(websocket)
+        connections = self.active_connections.setdefault(session_id, {})
+        while len(connections) >= self.max_connections_per_session:
+            oldest_id = next(iter(connections))
+            close_outbox(connections.pop(oldest_id), status.WS_1008_POLICY_VIOLATION)
+            print(f"WebSocket evicted: {session_id} ({oldest_id})")
+        
+        connection_id = uuid4().hex
+        connections[connection_id] = websocket
+        print(f"WebSocket connected: {session_id} ({connection_id})")
+        return connection_id
 
-    def disconnect(self, session_id: str):
-        if session_id in self.active_connections:
-            del self.active_connections[session_id]
-            print(f"WebSocket disconnected: {session_id}")
+    def disconnect(self, session_id: str, connection_id: str):
+        connections = self.active_connections.get(session_id)
+        websocket = connections.pop(connection_id, None) if connections else None
+        if websocket is not None:
+            close_outbox(websocket)
+            print(f"WebSocket disconnected: {session_id} ({connection_id})")
+            if not connections:
+                del self.active_connections[session_id]
 
     async def send_notification(self, session_id: str, message: dict):
-        if session_id in self.active_connections:
-            try:
-                await self.active_connections[session_id].send_json(message)
-                return True
-            except Exception as e:
-                print(f"Error sending notification: {e}")
-                self.disconnect(session_id)
-        return False
+        """Отправить уведомление сессии через брокер (в каком бы процессе ни было ее соединение)"""
+        await broker.publish(NOTIFICATIONS_CHANNEL, {"session_id": session_id, "message": message})
+
+    async def handle_broker_message(self, payload: dict):
+        await self.deliver(payload["session_id"], payload["message"])
+
+    async def deliver(self, session_id: str, message: dict):
+        """Поставить уведомление в очереди всех локальных соединений сессии"""
+        connections = list(self.active_connections.get(session_id, {}).items())
+        if not connections:
+            return False
+        
+        failed = fan_out([websocket for _, websocket in connections], message)
+        for connection_id, websocket in connections:
+            if websocket in failed:
+                self.disconnect(session_id, connection_id)
+        return len(failed) < len(connections)
+
+notification_manager = NotificationManager(settings.WS_MAX_CONNECTIONS_PER_SESSION)
 
-notification_manager = NotificationManager()
+async def replay_unsent_notifications(websocket: WebSocket, session_id: str, after: int | None = None):
+    """Отправляет накопленные уведомления одним кадром и отмечает их отправленными одним запросом.
+    
+    В кадре передается `cursor` - id последнего уведомления. Клиент может
+    передать его как `after` при переподключении: уведомления до курсора
+    не отправляются повторно, а только отмечаются доставленными.
+    """
+    async with AsyncSessionLocal() as db:
+        unsent_notifications = await get_unsent_notifications(db, session_id)
+    if not unsent_notifications:
+        return
+    
+    pending = [n for n in unsent_notifications if after is None or n.id > after]
+    if pending:
+        await send(websocket, {
+            "type": "notifications",
+            "data": [notification.model_dump(mode="json") for notification in pending],
+            "cursor": max(notification.id for notification in pending)
+        })
+    
+    async with AsyncSessionLocal() as db:
+        await mark_notifications_sent(db, [notification.id for notification in unsent_notifications])
 
-async def websocket_endpoint(websocket: WebSocket, session_id: str):
-    await notification_manager.connect(websocket, session_id)
+async def websocket_endpoint(websocket: WebSocket, session_id: str, after: int | None = None):
+    connection_id = await notification_manager.connect(websocket, session_id)
     
     try:
-        await websocket.send_json({
+        enqueue(websocket, {
             "type": "connected", 
             "message": f"Connected to notifications for session {session_id}"
         })
         
         try:
-            async with AsyncSessionLocal() as db:
-                from app.services.crud.notification import get_unsent_notifications, mark_notification_sent
-                unsent_notifications = await get_unsent_notifications(db, session_id)
-                for notification in unsent_notifications:
-                    try:
-                        await websocket.send_json({
-                            "type": "notification",
-                            "data": notification.model_dump(),
-                            "timestamp": notification.created_at.isoformat()
-                        })
-                        await mark_notification_sent(db, notification.id)
-                    except Exception as e:
-                        print(f"Error sending notification: {e}")
-                        continue
+            await replay_unsent_notifications(websocket, session_id, after)
+        except WebSocketDisconnect:
+            raise
         except Exception as e:
             print(f"Error loading notifications from DB: {e}")
           
@@ -61,17 +109,17 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
             print(f"Received from {session_id}: {data}")
             
             if data == "ping":
-                await websocket.send_text("pong")
+                enqueue(websocket, "pong")
                 print(f"Sent pong to {session_id}")
             else:
-                await websocket.send_json({
+                enqueue(websocket, {
                     "type": "echo",
                     "message": f"You said: {data}",
                     "session_id": session_id
                 })
                 
     except WebSocketDisconnect:
-        notification_manager.disconnect(session_id)
+        notification_manager.disconnect(session_id, connection_id)
     except Exception as e:
         print(f"WebSocket error: {e}")
-        notification_manager.disconnect(session_id)
\ No newline at end of file
+        notification_manager.disconnect(session_id, connection_id)
\ No newline at end of file
@@ -0,0 +1,81 @@
+from sqlalchemy import select
+
+from app.db.models import Queue
+from app.db.session import AsyncSessionLocal
+from app.schemas.websocket import QueueBoardMessage
+from app.services.analytics.queue_ws import build_queue_removed_message, get_queue_board_data
+from app.services.analytics.ticket_ws import get_tickets_websocket_data
+from app.services.ticket_snapshots import ticket_snapshot_cache
+from app.services.websockets.managers import manager_factory
+
+
+async def push_ticket_positions(queue_id: int) -> None:
+    """Пересчитать позиции подписанных талонов очереди и разослать подписчикам.
+
+    Талоны читаются по ID без фильтра по очереди: талон, перемещенный в
+    другую очередь, получает снимок новой очереди и переходит к ней в
+    подписках менеджера.
+    """
+    ticket_snapshot_cache.invalidate_queue(queue_id)
+
+    ticket_manager = manager_factory.get_manager("tickets")
+    ticket_ids = ticket_manager.get_queue_tickets(queue_id)
+    if not ticket_ids:
+        return
+
+    async with AsyncSessionLocal() as db:
+        snapshots = await get_tickets_websocket_data(db, ticket_ids)
+    ticket_snapshot_cache.prime(snapshots)
+
+    for ticket_id, (ticket_queue_id, message) in snapshots.items():
+        ticket_manager.publish_ticket_state(ticket_id, ticket_queue_id, message)
+
+
+# queue_id -> event_id: очередь не переносится между мероприятиями, связь можно не перечитывать
+queue_event_ids: dict[int, int] = {}
+
+
+def remember_queue_events(messages: list[QueueBoardMessage]) -> None:
+    """Запомнить мероприятия очередей из уже загруженного состояния табло"""
+    for message in messages:
+        queue_event_ids[message.queue_id] = message.event_id
+
+
+async def get_queue_event_id(queue_id: int) -> int | None:
+    """ID мероприятия очереди (None, если очереди нет)"""
+    event_id = queue_event_ids.get(queue_id)
+    if event_id is None:
+        async with AsyncSessionLocal() as db:
+            event_id = await db.scalar(select(Queue.event_id).where(Queue.id == queue_id))
+        if event_id is not None:
+            queue_event_ids[queue_id] = event_id
+    return event_id
+
+
+async def push_queue_status(queue_id: int) -> None:
+    """Разослать состояние очереди подписчикам очереди и ее мероприятия.
+
+    Если ни на очередь, ни на ее мероприятие никто не подписан, в БД не ходит.
+    Мероприятие окончательно удаленной очереди берется из queue_event_ids:
+    его заполняют и подключения табло.
+    """
+    queue_manager = manager_factory.get_manager("queues")
+    event_manager = manager_factory.get_manager("events")
+    if queue_id not in queue_manager.queue_subscriptions:
+        if not event_manager.event_subscriptions:
+            return
+        if await get_queue_event_id(queue_id) not in event_manager.event_subscriptions:
+            return
+
+    async with AsyncSessionLocal() as db:
+        messages = await get_queue_board_data(db, [queue_id])
+    if not messages:
+        # Очередь удалена из БД: последний кадр с is_deleted, чтобы табло ее убрали
+        event_id = queue_event_ids.pop(queue_id, None)
+        if event_id is None:
+            return
+        messages = [build_queue_removed_message(queue_id, event_id)]
+    remember_queue_events(messages)
+    for message in messages:
+        await queue_manager.notify_entity_subscribers(queue_id, message)
+        await event_manager.notify_entity_subscribers(message.event_id, message, key=("queue", queue_id))
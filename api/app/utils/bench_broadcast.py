@@ -0,0 +1,127 @@
+import asyncio
+import json
+import time
+
+from starlette.websockets import WebSocket, WebSocketState
+
+from app.schemas.websocket import TicketWebSocketMessage
+from app.services.websockets.delivery import close_outbox, encode_frame, enqueue, fan_out, open_outbox
+
+SUBSCRIBERS = 1000
+BROADCASTS = 200
+
+MESSAGE = TicketWebSocketMessage(
+    type="ticket_info",
+    ticket_id=12345,
+    position=42,
+    people_ahead=17,
+    queue_name="Очередь A",
+    queue_letter="A",
+    estimated_wait_time=25,
+    status="waiting",
+)
+
+
+async def _receive() -> dict:
+    return {"type": "websocket.disconnect"}
+
+
+class Transport:
+    """ASGI-транспорт, который ничего не отправляет, а только считает кадры"""
+
+    def __init__(self):
+        self.sent = 0
+        self.expected = 0
+        self.delivered = asyncio.Event()
+
+    def expect(self, frames: int) -> None:
+        self.sent = 0
+        self.expected = frames
+        self.delivered.clear()
+
+    async def send(self, message: dict) -> None:
+        self.sent += 1
+        if self.sent == self.expected:
+            self.delivered.set()
+
+
+def open_sockets(transport: Transport) -> list[WebSocket]:
+    sockets = []
+    for _ in range(SUBSCRIBERS):
+        websocket = WebSocket({"type": "websocket", "path": "/", "headers": []}, _receive, transport.send)
+        websocket.client_state = WebSocketState.CONNECTED
+        websocket.application_state = WebSocketState.CONNECTED
+        open_outbox(websocket)
+        sockets.append(websocket)
+    return sockets
+
+
+def serialize_per_connection() -> None:
+    """Прежняя сериализация: model_dump() и stdlib json (как в send_json) для каждого соединения"""
+    for _ in range(SUBSCRIBERS):
+        json.dumps(MESSAGE.model_dump(), separators=(",", ":"), ensure_ascii=False)
+
+
+def serialize_once() -> None:
+    """Текущая сериализация: один кадр через pydantic-core на всю рассылку"""
+    encode_frame(MESSAGE)
+
+
+def broadcast_per_connection(sockets: list[WebSocket]) -> None:
+    for websocket in sockets:
+        enqueue(websocket, json.dumps(MESSAGE.model_dump(), separators=(",", ":"), ensure_ascii=False))
+
+
+def broadcast_encoded_once(sockets: list[WebSocket]) -> None:
+    fan_out(sockets, MESSAGE)
+
+
+def report(name: str, seconds: float) -> None:
+    print(f"{name:<32} | {seconds * 1000:>8.3f} | {seconds / SUBSCRIBERS * 1e6:>8.3f}")
+
+
+def measure_serialization(serialize) -> float:
+    serialize()
+    started = time.process_time()
+    for _ in range(BROADCASTS):
+        serialize()
+    return (time.process_time() - started) / BROADCASTS
+
+
+async def measure_delivery(broadcast, sockets: list[WebSocket], transport: Transport) -> float:
+    """CPU на рассылку целиком: сериализация, постановка в очереди и отправка писателями"""
+    total = 0.0
+    for run in range(BROADCASTS + 1):
+        transport.expect(len(sockets))
+        started = time.process_time()
+        broadcast(sockets)
+        await transport.delivered.wait()
+        if run:  # первый прогон - прогрев
+            total += time.process_time() - started
+    return total / BROADCASTS
+
+
+async def main():
+    transport = Transport()
+    sockets = open_sockets(transport)
+
+    print(f"CPU per broadcast of one ticket update to {SUBSCRIBERS} subscribers, {BROADCASTS} runs")
+    print(f"{'path':<32} | {'ms':>8} | {'us/conn':>8}")
+    before = measure_serialization(serialize_per_connection)
+    after = measure_serialization(serialize_once)
+    report("serialize: json per connection", before)
+    report("serialize: pydantic-core once", after)
+    print(f"serialization speedup: {before / after:.0f}x")
+
+    before = await measure_delivery(broadcast_per_connection, sockets, transport)
+    after = await measure_delivery(broadcast_encoded_once, sockets, transport)
+    report("deliver: json per connection", before)
+    report("deliver: one shared frame", after)
+    print(f"delivery speedup: {before / after:.2f}x")
+
+    for websocket in sockets:
+        close_outbox(websocket)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,122 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import aiohttp
+
+BENCH_PORT = 8100
+API_BASE = f"http://localhost:{BENCH_PORT}"
+WORKER_COUNTS = (1, 2, 4, 8)
+DURATION = 10.0
+CONCURRENCY = 64
+
+
+def start_server(workers: int) -> subprocess.Popen:
+    env = os.environ | {
+        "API_HOST": "127.0.0.1",
+        "API_PORT": str(BENCH_PORT),
+        "API_WORKERS": str(workers),
+        "API_RELOAD": "false",
+        "WS_BROKER": "postgres" if workers > 1 else os.environ.get("WS_BROKER", "memory"),
+    }
+    return subprocess.Popen(
+        [sys.executable, "-m", "app.utils.serve"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def stop_server(server: subprocess.Popen) -> None:
+    server.terminate()
+    try:
+        server.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        server.kill()
+        server.wait()
+
+
+async def wait_until_ready(session: aiohttp.ClientSession, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            async with session.get(f"{API_BASE}/docs") as resp:
+                if resp.status == 200:
+                    return
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.3)
+    raise RuntimeError("Server did not start")
+
+
+async def create_event(session: aiohttp.ClientSession) -> dict:
+    login_data = {"username": "superadmin", "password": "superadmin123"}
+    async with session.post(f"{API_BASE}/auth/login", json=login_data) as resp:
+        result = await resp.json()
+    headers = {"Authorization": f"Bearer {result['access_token']}"}
+
+    event_data = {"name": f"Bench {datetime.now().strftime('%H:%M:%S')}", "is_active": True}
+    async with session.post(f"{API_BASE}/event/", json=event_data, headers=headers) as resp:
+        event = await resp.json()
+
+    for _ in range(4):
+        queue_data = {"event_id": event["id"], "is_active": True}
+        async with session.post(f"{API_BASE}/queue/", json=queue_data, headers=headers) as resp:
+            assert resp.status == 201, "Queue creation failed"
+    return event
+
+
+async def issue_tickets(session: aiohttp.ClientSession, event: dict, workers: int) -> tuple[int, int]:
+    """Выдает талоны в CONCURRENCY потоков в течение DURATION секунд"""
+    run_id = f"bench_{workers}_{time.time_ns()}"
+    deadline = time.monotonic() + DURATION
+    counter = 0
+    completed = 0
+    failed = 0
+
+    async def client() -> None:
+        nonlocal counter, completed, failed
+        while time.monotonic() < deadline:
+            counter += 1
+            ticket_data = {"event_code": event["code"], "session_id": f"{run_id}_{counter}"}
+            async with session.post(f"{API_BASE}/ticket/", json=ticket_data) as resp:
+                await resp.read()
+                if resp.status == 201:
+                    completed += 1
+                else:
+                    failed += 1
+
+    await asyncio.gather(*(client() for _ in range(CONCURRENCY)))
+    return completed, failed
+
+
+async def bench(workers: int) -> float:
+    server = start_server(workers)
+    try:
+        connector = aiohttp.TCPConnector(limit=CONCURRENCY)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            await wait_until_ready(session)
+            event = await create_event(session)
+            started = time.monotonic()
+            completed, failed = await issue_tickets(session, event, workers)
+            elapsed = time.monotonic() - started
+    finally:
+        stop_server(server)
+
+    rps = completed / elapsed
+    print(f"{workers:>7} | {rps:>8.1f} | {completed:>6} | {failed:>6}")
+    return rps
+
+
+async def main():
+    print(f"POST /ticket/ for {DURATION:.0f}s, {CONCURRENCY} concurrent clients")
+    print(f"{'workers':>7} | {'req/s':>8} | {'ok':>6} | {'failed':>6}")
+    for workers in WORKER_COUNTS:
+        await bench(workers)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,34 @@
+import uvicorn
+
+from app.core.config import settings
+
+
+def main():
+    """Запуск API с параметрами сервера из настроек"""
+    if settings.API_RELOAD:
+        # Режим разработки: один процесс с отслеживанием изменений файлов
+        uvicorn.run(
+            "app.main:app",
+            host=settings.API_HOST,
+            port=settings.API_PORT,
+            reload=True,
+        )
+        return
+
+    if settings.API_WORKERS > 1 and settings.WS_BROKER == "memory":
+        print("Warning: WS_BROKER=memory with several workers, pushes will not cross worker processes")
+
+    uvicorn.run(
+        "app.main:app",
+        host=settings.API_HOST,
+        port=settings.API_PORT,
+        workers=settings.API_WORKERS,
+        loop=settings.API_LOOP,
+        http=settings.API_HTTP,
+        timeout_keep_alive=settings.API_KEEPALIVE_TIMEOUT,
+        backlog=settings.API_BACKLOG,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import asyncio
+from datetime import datetime
+
+import aiohttp
+import pytest
+
+
+API_BASE = "http://localhost:8000"
+TICKETS_COUNT = 300
+
+
+async def admin_headers(session: aiohttp.ClientSession) -> dict:
+    login_data = {"username": "superadmin", "password": "superadmin123"}
+    async with session.post(f"{API_BASE}/auth/login", json=login_data) as resp:
+        assert resp.status == 200, "Admin login failed"
+        result = await resp.json()
+    return {"Authorization": f"Bearer {result['access_token']}"}
+
+
+async def create_event_with_queue(session: aiohttp.ClientSession, headers: dict) -> dict:
+    event_data = {"name": f"Concurrency test {datetime.now().strftime('%H:%M:%S')}", "is_active": True}
+    async with session.post(f"{API_BASE}/event/", json=event_data, headers=headers) as resp:
+        assert resp.status == 201, "Event creation failed"
+        event = await resp.json()
+
+    queue_data = {"event_id": event["id"], "is_active": True}
+    async with session.post(f"{API_BASE}/queue/", json=queue_data, headers=headers) as resp:
+        assert resp.status == 201, "Queue creation failed"
+
+    return event
+
+
+@pytest.mark.asyncio
+async def test_concurrent_ticket_positions_are_unique_and_contiguous():
+    """Сотни одновременных POST /ticket/ получают позиции 1..N без дублей и пропусков"""
+    connector = aiohttp.TCPConnector(limit=TICKETS_COUNT)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        headers = await admin_headers(session)
+        event = await create_event_with_queue(session, headers)
+        run_id = datetime.now().strftime('%H%M%S%f')
+
+        async def issue(index: int) -> dict:
+            ticket_data = {"event_code": event["code"], "session_id": f"concurrency_{run_id}_{index}"}
+            async with session.post(f"{API_BASE}/ticket/", json=ticket_data) as resp:
+                assert resp.status == 201, await resp.text()
+                result = await resp.json()
+            assert not result["is_existing_ticket"]
+            return result["ticket"]
+
+        tickets = await asyncio.gather(*(issue(i) for i in range(TICKETS_COUNT)))
+
+    positions = sorted(ticket["position"] for ticket in tickets)
+    print(f"✓ Issued {len(positions)} tickets concurrently")
+
+    assert len(set(positions)) == TICKETS_COUNT, "Duplicate positions issued"
+    assert positions == list(range(1, TICKETS_COUNT + 1)), "Positions are not contiguous"
@@ -0,0 +1,52 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.services.crud.notification import delete_expired_notifications, select_unsent_notifications
+from app.services.crud.queue import select_event_queues
+from app.services.crud.ticket import select_next_waiting_ticket, select_session_tickets
+from app.services.queue_load import select_status_counts
+
+
+# Горячие запросы приложения и индекс, которым каждый из них должен пользоваться
+HOT_QUERIES = [
+    ("ix_tickets_queue_id_sort_key_waiting", select_next_waiting_ticket(1)),
+    ("ix_tickets_queue_id_status", select_status_counts([1])),
+    ("ix_queues_event_id_active", select_event_queues(1)),
+    ("ix_tickets_session_id_created_at", select_session_tickets("session")),
+    ("ix_notifications_session_id_created_at_unsent", select_unsent_notifications("session")),
+    ("ix_notifications_sent_at_sent", delete_expired_notifications(7, 1000)),
+]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("index_name, statement", HOT_QUERIES)
+async def test_hot_queries_use_index(index_name: str, statement):
+    """Горячие запросы к талонам и очередям выполняются по индексу, а не полным сканированием.
+
+    asyncpg отправляет запросы подготовленными, с параметрами ($1, ...), и
+    PostgreSQL может перейти на обобщенный план, не зависящий от значений
+    параметров. Поэтому запрос компилируется так же, как его отправляет
+    приложение, и план проверяется принудительно обобщенный: частичный
+    индекс годится, только если его условие доказуемо без значений.
+    """
+    engine = create_async_engine(settings.ASYNC_DB_URL, poolclass=NullPool)
+    compiled = statement.compile(dialect=engine.dialect, compile_kwargs={"render_postcompile": True})
+    # Обобщенный план не зависит от значений параметров
+    arguments = ", ".join("NULL" for _ in compiled.positiontup)
+    try:
+        async with engine.connect() as conn:
+            # На маленькой тестовой базе планировщик и так предпочел бы seq scan
+            await conn.execute(text("SET enable_seqscan = off"))
+            await conn.execute(text("SET plan_cache_mode = force_generic_plan"))
+            await conn.exec_driver_sql(f"PREPARE hot_query AS {compiled}")
+            result = await conn.exec_driver_sql(f"EXPLAIN EXECUTE hot_query({arguments})")
+            plan = "\n".join(row[0] for row in result.all())
+    finally:
+        await engine.dispose()
+
+    print(plan)
+    assert "Seq Scan" not in plan, plan
+    assert index_name in plan, plan
@@ -129,8 +129,9 @@ class TestWebSocketWithAiohttpOnly:
                 # Получаем начальное состояние
                 initial_msg = await asyncio.wait_for(ws.receive(), timeout=10.0)
                 initial_data = json.loads(initial_msg.data)
-                print(f"✓ Initial ticket state: {initial_data['status']}")
+                print(f"✓ Initial ticket state: {initial_data['status']} (version {initial_data['version']})")
                 assert initial_data['status'] == 'waiting'
+                version = initial_data['version']
                 
                 # 4. Вызываем талон через API
                 call_result = await self.make_api_request(
@@ -146,8 +147,11 @@ class TestWebSocketWithAiohttpOnly:
                     # 5. Получаем обновление через WebSocket
                     update_msg = await asyncio.wait_for(ws.receive(), timeout=10.0)
                     update_data = json.loads(update_msg.data)
-                    print(f"✓ WebSocket update: {update_data['status']}")
-                    assert update_data['status'] == 'called'
+                    print(f"✓ WebSocket update: {update_data['changes']}")
+                    assert update_data['type'] == 'ticket_delta'
+                    assert update_data['version'] == version + 1
+                    assert update_data['changes']['status'] == 'called'
+                    version = update_data['version']
                 
                 # 6. Завершаем талон через API
                 complete_result = await self.make_api_request(
@@ -163,8 +167,9 @@ class TestWebSocketWithAiohttpOnly:
                     # 7. Получаем финальное обновление
                     final_msg = await asyncio.wait_for(ws.receive(), timeout=10.0)
                     final_data = json.loads(final_msg.data)
-                    print(f"✓ Final WebSocket update: {final_data['status']}")
-                    assert final_data['status'] == 'completed'
+                    print(f"✓ Final WebSocket update: {final_data['changes']}")
+                    assert final_data['version'] == version + 1
+                    assert final_data['changes']['status'] == 'completed'
 
     @pytest.mark.asyncio
     async def test_websocket_multiple_clients(self, base_url, ws_url, admin_headers):
@@ -215,7 +220,7 @@ class TestWebSocketWithAiohttpOnly:
             for session, ws, client_num in clients:
                 update_msg = await asyncio.wait_for(ws.receive(), timeout=10.0)
                 update_data = json.loads(update_msg.data)
-                assert update_data['status'] == 'called'
+                assert update_data['changes']['status'] == 'called'
                 print(f"✓ Client {client_num} received update")
                 
         finally:
@@ -247,6 +252,21 @@ class TestWebSocketWithAiohttpOnly:
         except Exception as e:
             print(f"✓ WebSocket properly handled error: {e}")
 
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("channel", ["queue", "event"])
+    async def test_websocket_board_not_found(self, ws_url, channel):
+        """Тест каналов табло: несуществующая очередь или мероприятие - ошибка и закрытие 1008"""
+        async with aiohttp.ClientSession() as session:
+            async with session.ws_connect(f"{ws_url}/ws/{channel}/99999999") as ws:
+                msg = await asyncio.wait_for(ws.receive(), timeout=5.0)
+                assert msg.type == aiohttp.WSMsgType.TEXT
+                assert json.loads(msg.data)["type"] == "error"
+
+                msg = await asyncio.wait_for(ws.receive(), timeout=5.0)
+                assert msg.type == aiohttp.WSMsgType.CLOSE
+                assert msg.data == 1008
+                print(f"✓ {channel} board channel closed: {msg.data}")
+
     @pytest.mark.asyncio
     async def test_websocket_authentication(self, ws_url):
         """Тест аутентификации WebSocket"""
@@ -10,4 +10,4 @@ echo "Creating superadmin..."
 uv run python -m app.utils.create_first_admin
 
 echo "Starting application..."
-exec uv run uvicorn app.main:app --host "${API_HOST}" --port "${API_PORT}" --reload
\ No newline at end of file
+exec uv run python -m app.utils.serve
\ No newline at end of file